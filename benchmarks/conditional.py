@@ -0,0 +1,35 @@
+""" Compares the bytes transferred when downloading a board repeatedly with
+plain, compressed and conditional requests
+
+    $ python -m benchmarks.conditional [cards] [downloads]
+"""
+import sys
+from time import perf_counter
+
+import requests
+
+from leankit.connector import Connector
+from .stub import StubServer, board
+
+
+def run(cards=2000, downloads=10):
+    routes = {'/Boards/1': board(cards=cards)}
+    for name, options in [('plain', {}), ('compressed', {'compress': True}),
+                          ('conditional', {'compress': True,
+                                           'conditional': True})]:
+        with StubServer(routes, **options) as server:
+            connector = Connector()
+            connector.base = server.base
+            connector.session = requests.Session()
+            start = perf_counter()
+            for _ in range(downloads):
+                connector.get('/Boards/1')
+            elapsed = perf_counter() - start
+            stats = connector.instruments.as_dict()['endpoints']['/Boards/{}']
+            print('{}: {:.2f}s, {:.1f} MB transferred, {} not modified'.format(
+                name, elapsed, server.transferred / 2 ** 20,
+                stats['not_modified']))
+
+
+if __name__ == '__main__':
+    run(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,34 @@
+""" Measures the cost of the different ways of accessing card data
+
+    $ python -m benchmarks.converter [cards] [--compact]
+"""
+import sys
+from timeit import timeit
+
+from leankit.kanban import Board
+from .stub import board
+
+
+PATHS = {'raw item': "card['Title']",
+         'attribute': 'card.title',
+         'datetime': 'card.last_move',
+         'list': 'card.tags',
+         'user': 'card.assigned_user',
+         'users': 'card.assigned_users',
+         'raw data': 'card.raw_data'}
+
+
+def run(cards=1000, compact=False):
+    instance = Board(board(cards=cards), 'Europe/Berlin', compact=compact)
+    for name, path in PATHS.items():
+        statement = 'for card in cards: {}'.format(path)
+        namespace = {'cards': list(instance.cards.values())}
+        cold = timeit(statement, number=1, globals=namespace)
+        warm = timeit(statement, number=10, globals=namespace) / 10
+        print('{:>10}: {:7.0f} ns cold, {:7.0f} ns warm'.format(
+            name, cold / cards * 1e9, warm / cards * 1e9))
+
+
+if __name__ == '__main__':
+    compact = '--compact' in sys.argv
+    run(*[int(arg) for arg in sys.argv[1:] if arg.isdigit()], compact=compact)
@@ -0,0 +1,44 @@
+""" Compares loading boards one after another with loading them as a fleet
+
+    $ python -m benchmarks.fleet [boards] [cards] [latency] [workers]
+"""
+import sys
+import tracemalloc
+from time import perf_counter
+
+from leankit import api
+from leankit.kanban import Board
+from leankit.fleet import load_boards
+from .stub import StubServer, board
+
+
+def run(boards=20, cards=100, latency=0.05, workers=10):
+    routes = {}
+    for board_id in range(1, boards + 1):
+        payload = board(board_id, cards)
+        payload['BoardUsers'] = [{'Id': user_id, 'FullName': str(user_id)}
+                                 for user_id in range(1, 201)]
+        routes['/Boards/{}'.format(board_id)] = payload
+    with StubServer(routes, latency) as server:
+        api.base = server.base
+        tracemalloc.start()
+        start = perf_counter()
+        sequential = [Board(board_id) for board_id in range(1, boards + 1)]
+        elapsed = perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0]
+        print('sequential: {:.2f}s, {:.1f} MB'.format(elapsed, size / 2 ** 20))
+        del sequential
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+
+        start = perf_counter()
+        fleet = load_boards(range(1, boards + 1), workers=workers)
+        elapsed = perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+        print('fleet ({} workers): {:.2f}s, {:.1f} MB, {} shared'.format(
+            workers, elapsed, size / 2 ** 20, fleet.stats['shared']))
+
+
+if __name__ == '__main__':
+    run(*[float(arg) if '.' in arg else int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,294 @@
+""" Seeded generator of realistic LeanKit API payloads at any scale
+
+The board has a tree of lanes up to `depth` levels deep, next to a backlog
+and an archive with a few sublanes each. Cards are spread over the lanes
+without children, with varied types, users, tags, classes of service and
+dates, and their histories move them through the lanes until the one they
+are in. The same seed and sizes always give the same payloads.
+
+    >>> generator = Generator(seed=1, cards=10000, lanes=200, depth=5)
+    >>> with StubServer(generator.routes()) as server:
+    ...     ...
+"""
+from random import Random
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+
+from .stub import card as template
+
+DATE = '%m/%d/%Y'
+DATETIME = '%m/%d/%Y %I:%M:%S %p'
+EVENT = '%m/%d/%Y at %I:%M:%S %p'
+TAGS = ['Bug', 'Urgent', 'Backend', 'Frontend', 'Docs', 'Ops', 'Security',
+        'Customer', 'Debt', 'Spike']
+EVENTS = ['CardFieldsChangedEventDTO', 'CardFieldsChangedEventDTO',
+          'UserAssignmentEventDTO', 'CommentPostEventDTO']
+MOVES = 0.6  # share of the events after the creation that are moves
+BACKLOG, ARCHIVE, LANE, CARD, USER, TYPE, CLASS = \
+    10, 20, 1000, 100000, 500, 600, 700  # first id of each kind
+
+
+class Generator(object):
+    """ Payloads of a board with `cards` cards in `lanes` lanes, `archived`
+    cards in the archive and `events` history events per card on average,
+    taking place over `days` days since `start` """
+
+    def __init__(self, seed=0, board_id=1, cards=1000, lanes=50, depth=3,
+                 archived=100, events=10, users=20, types=5, classes=3,
+                 start=datetime(2017, 1, 1), days=365):
+        self.seed = seed
+        self.board_id = board_id
+        self.events = events
+        self.start = start
+        self.days = days
+        self.version = 1
+        random = Random(seed)
+        self.users = [self._user_(USER + i) for i in range(users)]
+        self.types = [{'Id': TYPE + i, 'Name': 'Type {}'.format(i),
+                       'ColorHex': '#{:06x}'.format(random.randrange(2**24)),
+                       'IsDefault': i == 0, 'IconPath': None,
+                       'IsCardType': True, 'IsTaskType': i == 0,
+                       'IsDefaultTaskType': i == 0, 'IconName': None,
+                       'IconColor': None} for i in range(types)]
+        self.classes = [{'Id': CLASS + i, 'Title': 'Class {}'.format(i),
+                         'Policy': '', 'IconPath': '', 'ColorHex': '#FFFFFF',
+                         'CustomIconName': None, 'CustomIconColor': None,
+                         'UseColor': False} for i in range(classes)]
+        self.lanes = {}
+        self.sections = {'Lanes': [], 'Backlog': [], 'Archive': []}
+        self._tree_(random, lanes, depth)
+        self.cards = {}  # card dicts by id
+        self.contents = {lane_id: [] for lane_id in self.lanes}
+        leaves = {section: [lane for lane in lanes
+                            if not self.lanes[lane]['ChildLaneIds']]
+                  for section, lanes in self.sections.items()}
+        self.leaves = leaves['Backlog'] + leaves['Lanes']
+        for i in range(cards + archived):
+            section = 'Archive' if i >= cards else 'Backlog' \
+                if random.random() < 0.2 else 'Lanes'
+            self._card_(random, CARD + i, random.choice(leaves[section]),
+                        i >= cards)
+
+    def _user_(self, user_id):
+        email = 'user{}@example.org'.format(user_id)
+        return {'Id': user_id, 'FullName': 'User {}'.format(user_id),
+                'UserName': email, 'Role': 2, 'WIP': 0, 'Enabled': True,
+                'IsAccountOwner': False, 'IsDeleted': False,
+                'GravatarFeed': email,
+                'GravatarLink': '36020adab302af77eb6273e0b2ead7cf',
+                'EmailAddress': email, 'DateFormat': 'dd/MM/yyyy',
+                'Settings': None, 'RoleName': 'User'}
+
+    def _lane_(self, lane_id, section, parent=None, orientation=0):
+        lane = {'Id': lane_id, 'Description': '', 'Index': 0, 'Active': True,
+                'Title': 'Lane {}'.format(lane_id), 'CardLimit': 0,
+                'ClassType': 0, 'Type': 1, 'ActivityId': None,
+                'ActivityName': '', 'CardContextId': 0, 'Width': 1,
+                'ParentLaneId': parent or 0, 'Orientation': orientation,
+                'TaskBoardId': None, 'ChildLaneIds': [], 'SiblingLaneIds': [],
+                'IsDrillthroughDoneLane': False, 'IsDefaultDropLane': False,
+                'LaneState': 'lane'}
+        self.lanes[lane_id] = lane
+        self.sections[section].append(lane_id)
+        if parent:
+            lane['Index'] = len(self.lanes[parent]['ChildLaneIds'])
+            self.lanes[parent]['ChildLaneIds'].append(lane_id)
+        return lane
+
+    def _tree_(self, random, count, depth):
+        """ Lanes hanging from random parents up to the given depth, with
+        the width of each parent matching that of its children """
+        self._lane_(BACKLOG, 'Backlog')
+        for lane_id in (BACKLOG + 1, BACKLOG + 2):
+            self._lane_(lane_id, 'Backlog', BACKLOG, 1)
+        self._lane_(ARCHIVE, 'Archive')
+        for lane_id in (ARCHIVE + 1, ARCHIVE + 2):
+            self._lane_(lane_id, 'Archive', ARCHIVE)
+        levels = {lane_id: int(lane_id not in (BACKLOG, ARCHIVE))
+                  for lane_id in self.lanes}
+        self.top_level, parents = [], []
+        for lane_id in range(LANE, LANE + count):
+            parent = random.choice(parents) if parents and \
+                random.random() < 0.7 else None
+            siblings = self.lanes[parent]['ChildLaneIds'] if parent else []
+            orientation = self.lanes[siblings[0]]['Orientation'] \
+                if siblings else int(random.random() < 0.3)
+            lane = self._lane_(lane_id, 'Lanes', parent, orientation)
+            levels[lane_id] = levels[parent] + 1 if parent else 0
+            if levels[lane_id] < depth - 1:
+                parents.append(lane_id)
+            if not parent:
+                lane['Index'] = len(self.top_level)
+                self.top_level.append(lane_id)
+                lane['Orientation'] = 0
+        for lane_id in sorted(self.lanes, key=lambda i: -levels[i]):
+            lane = self.lanes[lane_id]
+            children = [self.lanes[child] for child in lane['ChildLaneIds']]
+            if not children:
+                lane['Width'] = random.choice([1, 1, 1, 2, 3])
+            elif children[0]['Orientation'] == 1:
+                lane['Width'] = max(child['Width'] for child in children)
+            else:
+                lane['Width'] = sum(child['Width'] for child in children)
+            for child in children:
+                child['SiblingLaneIds'] = [other['Id'] for other in children
+                                           if other is not child]
+        roots = [BACKLOG, ARCHIVE] + self.top_level
+        for lane_id in roots:
+            self.lanes[lane_id]['SiblingLaneIds'] = [
+                other for other in roots if other != lane_id]
+
+    def _time_(self, random, start=None):
+        """ Random time between the given one and the end of the period """
+        start = start or self.start
+        end = self.start + timedelta(days=self.days)
+        return start + timedelta(seconds=random.randrange(
+            max(1, int((end - start).total_seconds()))))
+
+    def _card_(self, random, card_id, lane_id, archived):
+        user = random.choice(self.users)
+        card_type = random.choice(self.types)
+        card = template(card_id, lane_id, user['Id'])
+        created = self._time_(random)
+        moved = self._time_(random, created)
+        service = random.choice(self.classes + [None] * len(self.classes))
+        card.update({
+            'Title': 'Card {} {}'.format(card_id, random.getrandbits(32)),
+            'Type': {'Id': card_type['Id']}, 'TypeId': card_type['Id'],
+            'TypeName': card_type['Name'], 'Priority': random.randrange(4),
+            'Size': random.randrange(8), 'Index': random.randrange(50),
+            'Version': random.randrange(1, 20),
+            'Tags': ','.join(random.sample(TAGS, random.randrange(4))),
+            'IsBlocked': random.random() < 0.1,
+            'LastMove': moved.strftime(DATETIME),
+            'LastActivity': self._time_(random, moved).strftime(DATETIME),
+            'DueDate': self._time_(random, created).strftime(DATE)
+            if random.random() < 0.3 else '',
+            'DateArchived': moved.strftime(DATE) if archived else '',
+            'ClassOfServiceId': service['Id'] if service else 0,
+            'ClassOfServiceTitle': service['Title'] if service else '',
+            'CommentsCount': random.randrange(5)})
+        card['AssignedUsers'][0].update(
+            {'FullName': user['FullName'], 'EmailAddress': user['UserName'],
+             'AssignedUserName': user['FullName']})
+        card['AssignedUserName'] = user['FullName']
+        self.cards[card_id] = card
+        self.contents[lane_id].append(card)
+
+    def board(self):
+        """ /Boards/{id}, with the archive lanes but not their cards. The
+        payloads share the data of the cards, copy them before changing it """
+        sections = {section: [dict(self.lanes[lane_id], Cards=[] if section
+                                   == 'Archive' else self.contents[lane_id])
+                              for lane_id in lanes]
+                    for section, lanes in self.sections.items()}
+        return dict(sections, **{
+            'Id': self.board_id, 'Title': 'Board {}'.format(self.board_id),
+            'Description': '', 'Version': self.version, 'Active': True,
+            'BoardUsers': self.users, 'CardTypes': self.types,
+            'ClassesOfService': self.classes, 'ClassOfServiceEnabled': True,
+            'AvailableTags': ','.join(TAGS), 'TopLevelLaneIds': self.top_level,
+            'BacklogTopLevelLaneId': BACKLOG, 'ArchiveTopLevelLaneId': ARCHIVE,
+            'Format': 0, 'IsCardIdEnabled': True, 'Prefix': '',
+            'EnableCardHistory': True, 'ArchiveCardDays': 14,
+            'OrganizationId': 1, 'CardContexts': [], 'ParentCards': []})
+
+    def archive(self):
+        """ /Board/{id}/Archive """
+        def lane(lane_id):
+            return dict(self.lanes[lane_id], Cards=self.contents[lane_id])
+
+        top = self.lanes[ARCHIVE]
+        return [{'Lane': lane(ARCHIVE), 'ParentLane': None, 'Dom': None,
+                 'ChildLanes': [{'Lane': lane(child), 'ParentLane': None,
+                                 'ChildLanes': [], 'Dom': None}
+                                for child in top['ChildLaneIds']]}]
+
+    def archive_cards(self):
+        """ /Board/{id}/ArchiveCards """
+        return [card for lane_id in self.sections['Archive']
+                for card in self.contents[lane_id]]
+
+    def history(self, card_id):
+        """ /Card/History/{board id}/{card id}, newest first, generated on
+        demand with a seed of its own. The last event is the card's last
+        move, to the lane it's in """
+        card = self.cards[card_id]
+        random = Random('{}:{}'.format(self.seed, card_id))
+        end = datetime.strptime(card['LastMove'], DATETIME)
+        count = random.randrange(1, 2 * self.events) if self.events > 1 \
+            else 1
+        times = sorted(end - timedelta(seconds=random.randrange(1, 86400 * 30))
+                       for _ in range(count - 2)) + [end][:count - 1]
+        moves = [random.random() < MOVES for _ in times[:-1]] + [True]
+        created = (times[0] if times else end) - timedelta(
+            seconds=random.randrange(86400))
+        lane = random.choice(self.leaves) if times else card['LaneId']
+        history = [self._event_(card, 'CardCreationEventDTO', created, None,
+                                lane, random)]
+        for index, (time, move) in enumerate(zip(times, moves)):
+            if not move:
+                kind = random.choice(EVENTS)
+                history.append(self._event_(card, kind, time, None, lane,
+                                            random))
+                continue
+            target = card['LaneId'] if index == len(times) - 1 \
+                else random.choice(self.leaves)
+            history.append(self._event_(card, 'CardMoveEventDTO', time, lane,
+                                        target, random))
+            lane = target
+        return history[::-1]
+
+    def _event_(self, card, kind, time, from_lane, to_lane, random):
+        user = random.choice(self.users)
+        return {'FromLaneId': from_lane,
+                'FromLaneTitle': self.lanes[from_lane]['Title']
+                if from_lane else None,
+                'CardId': card['Id'], 'CardTitle': card['Title'],
+                'ToLaneId': to_lane,
+                'ToLaneTitle': self.lanes[to_lane]['Title'],
+                'Type': kind, 'UserName': user['UserName'],
+                'UserFullName': user['FullName'], 'UserId': str(user['Id']),
+                'DateTime': time.strftime(EVENT), 'TimeDifference': '',
+                'LastDate': 0, 'OverrideType': None,
+                'TaskboardContainingCardTitle': None,
+                'TaskboardContainingCardId': None}
+
+    def routes(self):
+        """ Every url of the board for the StubServer, built on request """
+        return Routes(self)
+
+
+class Routes(Mapping):
+    """ Payloads of the generator by url, built when requested """
+
+    def __init__(self, generator):
+        self.generator = generator
+        board = generator.board_id
+        self.payloads = {
+            '/Boards': lambda: [{'Id': board, 'Title': 'Board {}'.format(
+                board)}],
+            '/Boards/{}'.format(board): generator.board,
+            '/Board/{}/Archive'.format(board): generator.archive,
+            '/Board/{}/ArchiveCards'.format(board): generator.archive_cards,
+            '/Board/{}/BoardVersion/{}/GetNewerIfExists'.format(
+                board, generator.version): lambda: None}
+        for card_id in generator.cards:
+            history = '/Card/History/{}/{}'.format(board, card_id)
+            card = '/Board/{}/GetCard/{}'.format(board, card_id)
+            self.payloads[history] = card_id
+            self.payloads[card] = card_id
+
+    def __getitem__(self, url):
+        payload = self.payloads[url]
+        if not isinstance(payload, int):
+            return payload()
+        if url.startswith('/Card/History/'):
+            return self.generator.history(payload)
+        return self.generator.cards[payload]
+
+    def __iter__(self):
+        return iter(self.payloads)
+
+    def __len__(self):
+        return len(self.payloads)
@@ -0,0 +1,41 @@
+""" Measures the time taken to import leankit in a new interpreter, and
+lists the heavier modules it imports
+
+    $ python -m benchmarks.importtime [runs] [module]
+"""
+import sys
+import subprocess
+from statistics import median
+
+HEAVY = ['requests', 'urllib3', 'asyncio', 'pytz', 'zoneinfo', 'numpy',
+         'cached_property', 'concurrent.futures', 'email.utils']
+
+
+def measure(module):
+    """ Returns the microseconds taken by the import and the modules
+    imported, as reported by `python -X importtime` """
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        stderr=subprocess.PIPE, universal_newlines=True, check=True).stderr
+    imported, total = set(), 0
+    for line in output.splitlines()[1:]:
+        _, cumulative, name = line.split('|')
+        imported.add(name.strip())
+        if name.strip() == module:
+            total = int(cumulative)
+    return total, imported
+
+
+def run(runs=10, module='leankit'):
+    times = []
+    for _ in range(runs):
+        total, imported = measure(module)
+        times.append(total)
+    print('import {}: {:.1f}ms median, {:.1f}ms min of {} runs'.format(
+        module, median(times) / 1000, min(times) / 1000, runs))
+    print('heavy modules imported: {}'.format(
+        ', '.join(name for name in HEAVY if name in imported) or 'none'))
+
+
+if __name__ == '__main__':
+    run(*[int(arg) if arg.isdigit() else arg for arg in sys.argv[1:]])
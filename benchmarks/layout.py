@@ -0,0 +1,63 @@
+""" Measures the lane layout computation on boards with many lanes
+
+    $ python -m benchmarks.layout [lanes] [depth]
+"""
+import sys
+from time import perf_counter
+
+from leankit.kanban import Board
+from .stub import board
+
+
+def lanes(count, depth, first=1000):
+    """ Tree of lanes in which every lane has up to `count ** (1 / depth)`
+    children, alternating vertical and horizontal splits """
+    breadth = max(2, round(count ** (1 / depth)))
+    payload = [{'Id': first, 'ParentLaneId': 0, 'ChildLaneIds': []}]
+    for lane_id in range(first + 1, first + count):
+        parent = payload[(lane_id - first - 1) // breadth]
+        payload.append({'Id': lane_id, 'ParentLaneId': parent['Id'],
+                        'ChildLaneIds': [], 'Orientation': len(payload) % 2})
+        parent['ChildLaneIds'].append(lane_id)
+    for lane in payload:
+        siblings = payload[lane['ParentLaneId'] - first]['ChildLaneIds'] \
+            if lane['ParentLaneId'] else []
+        lane.update({'Title': str(lane['Id']), 'Width': 1, 'Cards': [],
+                     'Index': siblings.index(lane['Id']) if siblings else 1,
+                     'SiblingLaneIds': [i for i in siblings
+                                        if i != lane['Id']]})
+        lane.setdefault('Orientation', 0)
+    return payload
+
+
+def chain(count, first=1000):
+    """ Single branch of nested lanes """
+    payload = []
+    for lane_id in range(first, first + count):
+        last = lane_id == first + count - 1
+        payload.append({'Id': lane_id, 'Title': str(lane_id), 'Index': 1,
+                        'Width': 1, 'Orientation': 0, 'Cards': [],
+                        'ParentLaneId': lane_id - 1 if lane_id > first else 0,
+                        'ChildLaneIds': [] if last else [lane_id + 1],
+                        'SiblingLaneIds': []})
+    return payload
+
+
+def measure(name, payload):
+    data = board(cards=0)
+    data['Lanes'] += payload
+    data['TopLevelLaneIds'].append(payload[0]['Id'])
+    instance = Board(data)
+    start = perf_counter()
+    instance.compute_layout()
+    print('{:>10}: {} lanes in {:.3f}s, board height {}'.format(
+        name, len(instance.lanes), perf_counter() - start, instance.height))
+
+
+def run(count=5000, depth=4):
+    measure('tree', lanes(count, depth))
+    measure('chain', chain(count))
+
+
+if __name__ == '__main__':
+    run(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,50 @@
+""" Compares the time to first access and the peak memory of eager and
+lazy boards, when a single card of a board with many lanes is needed
+
+    $ python -m benchmarks.lazy [cards] [lanes]
+"""
+import sys
+import json
+import tracemalloc
+from time import perf_counter
+
+from leankit.kanban import Board
+from .stub import board, card
+
+
+def payload(cards, lanes):
+    data = board(cards=0)
+    template = data['Lanes'].pop()
+    for lane_id in range(1000, 1000 + lanes):
+        lane = dict(template, Id=lane_id, Title=str(lane_id), Cards=[])
+        data['Lanes'].append(lane)
+        data['TopLevelLaneIds'].append(lane_id)
+    for card_id in range(100, 100 + cards):
+        lane = data['Lanes'][card_id % lanes]
+        lane['Cards'].append(card(card_id, lane['Id']))
+    data['TopLevelLaneIds'].remove(10)
+    return json.dumps(data)
+
+
+def measure(text, lazy):
+    data = json.loads(text)
+    tracemalloc.start()
+    start = perf_counter()
+    instance = Board(data, lazy=lazy)
+    instance.cards[100].title
+    elapsed = perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(cards=20000, lanes=200):
+    text = payload(cards, lanes)
+    for lazy in [False, True]:
+        elapsed, peak = measure(text, lazy)
+        print('{}: first access in {:.3f}s, peak {:.1f} MB'.format(
+            'lazy' if lazy else 'eager', elapsed, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    run(*[int(arg) for arg in sys.argv[1:]])
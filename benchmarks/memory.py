@@ -0,0 +1,35 @@
+""" Compares the memory used by regular and compact boards
+
+    $ python -m benchmarks.memory [cards]
+"""
+import sys
+import json
+import tracemalloc
+from time import perf_counter
+
+from leankit.kanban import Board
+from .stub import board
+
+
+def measure(payload, compact):
+    start = perf_counter()
+    Board(json.loads(payload), compact=compact)
+    elapsed = perf_counter() - start
+    tracemalloc.start()
+    instance = Board(json.loads(payload), compact=compact)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(instance.cards)
+    return size, elapsed
+
+
+def run(cards=10000):
+    payload = json.dumps(board(cards=cards))
+    for compact in [False, True]:
+        size, elapsed = measure(payload, compact)
+        print('{}: {:.1f} MB, {:.2f}s'.format(
+            'compact' if compact else 'regular', size / 2 ** 20, elapsed))
+
+
+if __name__ == '__main__':
+    run(*[int(arg) for arg in sys.argv[1:]])
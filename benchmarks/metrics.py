@@ -0,0 +1,48 @@
+""" Measures the flow metrics over synthetic histories
+
+    $ python -m benchmarks.metrics [events]
+"""
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from leankit.metrics import Flow
+
+
+def history(size, lanes=10, seed=0):
+    """ Cards moving forward through the lanes, one event per move """
+    random = np.random.default_rng(seed)
+    card = np.sort(random.integers(0, size // lanes, size))
+    step = np.arange(size) - np.searchsorted(card, card)
+    start = np.datetime64('2017-01-01T00:00:00')
+    offset = random.integers(0, 365 * 86400, size // lanes + 1)[card]
+    time = start + (offset + step * 86400).astype('timedelta64[s]')
+    kind = np.where(step == 0, 'CardCreationEventDTO', 'CardMoveEventDTO')
+    return {'CardId': card, 'Type': kind.astype(object), 'DateTime': time,
+            'ToLaneId': 100 + np.minimum(step, lanes - 1)}
+
+
+def measure(name, function, *args):
+    start = perf_counter()
+    function(*args)
+    print('{:>16}: {:.3f}s'.format(name, perf_counter() - start))
+
+
+def run(size=500000):
+    events = history(size)
+    days = np.arange('2017-01-01', '2018-01-01', dtype='datetime64[D]')
+    print('{} events'.format(size))
+    measure('build', Flow, events)
+    flow = Flow(events)
+    measure('cycle time', flow.cycle_time, [101], [109])
+    measure('lead time', flow.lead_time, [109])
+    measure('throughput', flow.throughput, [109], days)
+    measure('daily wip', flow.wip, days)
+    measure('daily cfd', flow.cumulative_flow, days)
+    half = {key: value[:size // 2] for key, value in events.items()}
+    measure('update', flow.update, half)
+
+
+if __name__ == '__main__':
+    run(*[int(arg) for arg in sys.argv[1:]])
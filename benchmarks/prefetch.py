@@ -0,0 +1,35 @@
+""" Compares sequential and concurrent history downloads
+
+    $ python -m benchmarks.prefetch [cards] [latency] [workers]
+"""
+import sys
+from time import perf_counter
+
+from leankit import api
+from leankit.kanban import Board
+from .stub import StubServer, board
+
+
+def run(cards=200, latency=0.05, workers=10):
+    payload = board(cards=cards)
+    routes = {'/Card/History/1/{}'.format(card['Id']): []
+              for card in payload['Lanes'][0]['Cards']}
+    with StubServer(routes, latency) as server:
+        api.base = server.base
+        sequential = Board(board(cards=cards))
+        start = perf_counter()
+        for card in sequential.cards.values():
+            card.history
+        elapsed = perf_counter() - start
+        print('sequential: {:.2f}s'.format(elapsed))
+
+        concurrent = Board(board(cards=cards))
+        start = perf_counter()
+        errors = concurrent.prefetch_history(workers=workers)
+        elapsed = perf_counter() - start
+        print('concurrent ({} workers): {:.2f}s, {} errors'.format(
+            workers, elapsed, len(errors)))
+
+
+if __name__ == '__main__':
+    run(*[float(arg) if '.' in arg else int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,58 @@
+""" Compares rebuilding daily states of a board by walking all the moves
+for each day with the checkpoints of Replay
+
+    $ python -m benchmarks.replay [cards] [moves]
+"""
+import sys
+import random
+from time import perf_counter
+from datetime import datetime, timedelta
+
+from leankit.replay import Replay
+
+
+def moves(cards, count, lanes=10, seed=0):
+    """ Cards created during a year and moving forward through the lanes """
+    generator = random.Random(seed)
+    start = datetime(2017, 1, 1)
+    result = []
+    for card in range(cards):
+        time = start + timedelta(seconds=generator.randrange(365 * 86400))
+        for step in range(count // cards):
+            result.append((time, card, 100 + min(step, lanes - 1)))
+            time += timedelta(hours=generator.randrange(1, 96))
+    return result
+
+
+def walk(moves, when):
+    counts, placement = {}, {}
+    for time, card, lane in moves:
+        if time <= when:
+            placement[card] = lane
+    for lane in placement.values():
+        counts[lane] = counts.get(lane, 0) + 1
+    return counts
+
+
+def run(cards=10000, count=100000):
+    log = moves(cards, count)
+    days = [datetime(2017, 1, 1) + timedelta(days=day) for day in range(365)]
+    print('{} cards, {} moves, {} days'.format(cards, len(log), len(days)))
+    start = perf_counter()
+    expected = [walk(log, day) for day in days]
+    print('{:>12}: {:.2f}s'.format('walk', perf_counter() - start))
+    start = perf_counter()
+    replay = Replay(log)
+    print('{:>12}: {:.2f}s'.format('build', perf_counter() - start))
+    start = perf_counter()
+    counts = [replay.counts_at(day) for day in days]
+    print('{:>12}: {:.2f}s'.format('counts_at', perf_counter() - start))
+    start = perf_counter()
+    for day in days:
+        replay.state_at(day)
+    print('{:>12}: {:.2f}s'.format('state_at', perf_counter() - start))
+    assert counts == expected
+
+
+if __name__ == '__main__':
+    run(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,43 @@
+""" Compares building a board and the history of its cards from their
+payloads with restoring a snapshot
+
+    $ python -m benchmarks.snapshot [cards] [events]
+"""
+import os
+import sys
+import json
+import tempfile
+from time import perf_counter
+
+from leankit.kanban import Board
+from .stub import board
+
+
+def event(card_id, index):
+    return {'Type': 'CardMoveEventDTO', 'CardId': card_id, 'UserId': 1,
+            'DateTime': '02/27/2017 at 05:58:08 PM', 'ToLaneId': 10,
+            'FromLaneId': 11, 'Position': index}
+
+
+def run(cards=10000, events=10):
+    payload = json.dumps(board(cards=cards))
+    histories = json.dumps([[event(card_id, i) for i in range(events)]
+                            for card_id in range(cards)])
+    start = perf_counter()
+    instance = Board(json.loads(payload))
+    for card, history in zip(instance.cards.values(), json.loads(histories)):
+        card.__dict__['history'] = card._history_(history)
+    print('payload: {:.3f}s'.format(perf_counter() - start))
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'board.snapshot')
+        start = perf_counter()
+        instance.save_snapshot(path)
+        print('save: {:.3f}s, {:.1f} MB'.format(
+            perf_counter() - start, os.path.getsize(path) / 2 ** 20))
+        start = perf_counter()
+        Board.load_snapshot(path)
+        print('load: {:.3f}s'.format(perf_counter() - start))
+
+
+if __name__ == '__main__':
+    run(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,46 @@
+""" Compares the peak memory used to download and process the recent
+archive as a whole and as a stream, from a local stub server. The peaks
+include the response encoded by the server, which runs in the same process
+
+    $ python -m benchmarks.stream [cards]
+"""
+import sys
+import tracemalloc
+from time import perf_counter
+from unittest.mock import patch
+
+from leankit import kanban
+from leankit.connector import Connector
+from .stub import StubServer, board, card
+
+
+def measure(connector, stream):
+    instance = kanban.Board(board(cards=0))
+    tracemalloc.start()
+    start = perf_counter()
+    with patch.object(kanban, 'api', connector):
+        cards = 0
+        for item in (instance.iter_archive_cards() if stream
+                     else instance.get_recent_archive()):
+            del instance.cards[item.id]  # processed and dropped
+            cards += 1
+    elapsed = perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return cards, peak, elapsed
+
+
+def run(cards=20000):
+    archive = [card(card_id, 12) for card_id in range(100, 100 + cards)]
+    with StubServer({'/Board/1/ArchiveCards': archive}) as server:
+        connector = Connector()
+        connector.base = server.base
+        for stream in [False, True]:
+            count, peak, elapsed = measure(connector, stream)
+            print('{}: {} cards, peak {:.1f} MB, {:.2f}s'.format(
+                'stream' if stream else 'whole', count, peak / 2 ** 20,
+                elapsed))
+
+
+if __name__ == '__main__':
+    run(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,148 @@
+import json
+import gzip
+from time import sleep
+from hashlib import md5
+from threading import Thread
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer(object):
+    """ Local LeanKit API replacement serving canned responses
+
+    `routes` maps API urls (e.g. '/Boards/1') to the data returned inside
+    `ReplyData`. Every request is delayed by `latency` seconds. When
+    `conditional`, responses carry an ETag and are answered with 304 if it
+    matches, and when `compress`, they are gzipped if the client accepts it.
+    The bytes sent in response bodies are counted in `transferred`. """
+
+    def __init__(self, routes, latency=0, conditional=False, compress=False):
+        self.routes = routes
+        self.latency = latency
+        self.conditional = conditional
+        self.compress = compress
+        self.requests = 0
+        self.transferred = 0
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_(),
+                                          bind_and_activate=False)
+        self.server.request_queue_size = 128
+        self.server.daemon_threads = True
+        self.server.server_bind()
+        self.server.server_activate()
+
+    @property
+    def base(self):
+        return 'http://127.0.0.1:{}/kanban/api'.format(self.server.server_port)
+
+    def __enter__(self):
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stub.requests += 1
+                sleep(stub.latency)
+                url = self.path.replace('/kanban/api', '', 1)
+                if url in stub.routes:
+                    reply = {'ReplyCode': 200, 'ReplyText': 'OK',
+                             'ReplyData': [stub.routes[url]]}
+                else:
+                    reply = {'ReplyCode': 100, 'ReplyText': 'Not Found',
+                             'ReplyData': []}
+                body = json.dumps(reply).encode()
+                etag = '"{}"'.format(md5(body).hexdigest())
+                if stub.conditional and \
+                        self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                if stub.conditional:
+                    self.send_header('ETag', etag)
+                if stub.compress and \
+                        'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                stub.transferred += len(body)
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def card(card_id, lane_id, user_id=1):
+    """ Card payload with the same fields as those returned by LeanKit """
+    return {
+        'SystemType': 'Card', 'Id': card_id, 'LaneId': lane_id,
+        'Title': 'Card {}'.format(card_id), 'Description': '',
+        'Type': {'Id': 1}, 'TypeId': 1, 'TypeName': 'Task',
+        'TypeIconPath': '', 'TypeColorHex': '#f5f2bc', 'Color': '#f5f2bc',
+        'Priority': 1, 'PriorityText': 'Normal', 'Size': 0, 'Active': False,
+        'Version': 1, 'AssignedUsers': [{
+            'Id': user_id, 'AssignedUserId': user_id,
+            'FullName': 'User {}'.format(user_id),
+            'AssignedUserName': 'User {}'.format(user_id),
+            'EmailAddress': 'user{}@example.org'.format(user_id),
+            'GravatarLink': '36020adab302af77eb6273e0b2ead7cf?s=25',
+            'SmallGravatarLink': '36020adab302af77eb6273e0b2ead7cf?s=17',
+            'HasGravatar': False}],
+        'CardDrillThroughBoards': [], 'CardContexts': None,
+        'IsBlocked': False, 'BlockReason': '', 'BlockStateChangeDate': '',
+        'Index': 0, 'DueDate': '', 'StartDate': '', 'ExternalSystemName': '',
+        'ExternalSystemUrl': '', 'ExternalCardID': '', 'Tags': 'Tag1,Tag2',
+        'CountOfOldCards': 0, 'LastMove': '02/27/2017 05:58:08 PM',
+        'LastActivity': '03/10/2017 11:21:01 AM', 'DateArchived': '',
+        'LastComment': '', 'CommentsCount': 0, 'LastAttachment': '',
+        'AttachmentsCount': 0, 'AssignedUserName': 'User {}'.format(user_id),
+        'AssignedUserId': user_id, 'AssignedUserIds': [user_id],
+        'GravatarLink': '36020adab302af77eb6273e0b2ead7cf?s=25',
+        'SmallGravatarLink': '36020adab302af77eb6273e0b2ead7cf?s=17',
+        'CardDrillThroughBoardIds': [], 'DrillThroughBoardId': None,
+        'HasDrillThroughBoard': False, 'HasMultipleDrillThroughBoards': False,
+        'DrillThroughStatistics': None, 'DrillThroughCompletionPercent': None,
+        'DrillThroughProgressTotal': None,
+        'DrillThroughProgressComplete': None,
+        'DrillThroughProgressSizeComplete': None,
+        'DrillThroughProgressSizeTotal': None, 'ClassOfServiceId': 0,
+        'ClassOfServiceTitle': '', 'ClassOfServiceIconPath': '',
+        'ClassOfServiceColorHex': '', 'ClassOfServiceCustomIconName': None,
+        'ClassOfServiceCustomIconColor': None, 'CardTypeIconColor': None,
+        'CardTypeIconName': None, 'CurrentTaskBoardId': None,
+        'TaskBoardCompletionPercent': None, 'TaskBoardCompletedCardCount': 0,
+        'TaskBoardCompletedCardSize': 0, 'TaskBoardTotalCards': None,
+        'TaskBoardTotalSize': None, 'CurrentContext': None,
+        'ParentCardId': None, 'ParentCardIds': []}
+
+
+def board(board_id=1, cards=100):
+    """ Minimal board payload with a single lane holding all cards """
+    lane = {'Id': 10, 'Title': 'Lane', 'Index': 0, 'Width': 1,
+            'Orientation': 0, 'ParentLaneId': 0, 'ChildLaneIds': [],
+            'SiblingLaneIds': [], 'Cards': []}
+    for card_id in range(100, 100 + cards):
+        lane['Cards'].append(card(card_id, 10))
+    backlog = dict(lane, Id=11, Title='Backlog', Cards=[])
+    archive = dict(lane, Id=12, Title='Archive', Cards=[])
+    return {'Id': board_id, 'Title': 'Board', 'Version': 1,
+            'BoardUsers': [{'Id': 1, 'UserName': 'user1@example.org',
+                            'FullName': 'User 1'}],
+            'CardTypes': [{'Id': 1, 'Name': 'Task'}],
+            'ClassesOfService': [], 'AvailableTags': 'Tag1,Tag2',
+            'Lanes': [lane], 'Backlog': [backlog], 'Archive': [archive],
+            'TopLevelLaneIds': [10], 'BacklogTopLevelLaneId': 11,
+            'ArchiveTopLevelLaneId': 12}
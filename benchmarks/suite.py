@@ -0,0 +1,184 @@
+""" Measures the time and peak memory of the hot paths over a generated
+board of any size, optionally downloading it from a local stub server to
+measure the connector as well
+
+    $ python -m benchmarks.suite [--cards N] [--lanes N] [--depth N]
+          [--events N] [--seed N] [--server] [--json FILE] [names ...]
+"""
+import os
+import json
+import argparse
+import tempfile
+import tracemalloc
+from time import perf_counter
+from datetime import datetime, timedelta
+
+from leankit import api
+from leankit.kanban import Board
+from .stub import StubServer
+from .generator import Generator
+
+DAYS = [datetime(2017, 1, 1) + timedelta(days=day) for day in range(365)]
+
+
+def benchmarks(generator):
+    """ Pairs of functions by name: the first one prepares the input of the
+    second one, which is the one measured """
+    text = json.dumps(generator.board())
+    histories = {card_id: generator.history(card_id)
+                 for card_id in generator.cards}
+
+    def board(**kwargs):
+        return lambda: Board(json.loads(text), **kwargs)
+
+    def with_history():
+        instance = Board(json.loads(text))
+        for card in instance.cards.values():
+            card.__dict__['history'] = card._history_(histories[card.id])
+        return instance
+
+    def geometry(instance):
+        instance.compute_layout()
+        for lane in instance.lanes.values():
+            lane.left, lane.top, lane.width, lane.height
+
+    def tree(instance):
+        instance.index_lanes()
+        for lane in instance.lanes.values():
+            lane.path, lane.ascendants, lane.descendants
+
+    def access(instance):
+        for card in instance.cards.values():
+            card.title, card.last_move, card.tags, card.assigned_user
+
+    def history(instance):
+        for card in instance.cards.values():
+            for event in card._history_(histories[card.id]):
+                event.date_time, event.to_lane
+
+    def replay(instance):
+        replay = instance.replay()
+        for day in DAYS:
+            replay.counts_at(day)
+
+    def snapshot(instance):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'board.snapshot')
+            instance.save_snapshot(path)
+            Board.load_snapshot(path)
+
+    return {
+        'decode': (lambda: text, json.loads),
+        'board': (lambda: json.loads(text), Board),
+        'board compact': (lambda: json.loads(text),
+                          lambda data: Board(data, compact=True)),
+        'board lazy': (lambda: json.loads(text), lambda data: Board(
+            data, lazy=True).cards[next(iter(generator.cards))]),
+        'layout': (board(), geometry),
+        'lane tree': (board(), tree),
+        'card access': (board(), access),
+        'history': (board(), history),
+        'replay': (with_history, replay),
+        'query': (board(), lambda instance: instance.query(tag='Bug')),
+        'snapshot': (with_history, snapshot)}
+
+
+def server_benchmarks(generator, workers):
+    """ Like benchmarks, downloading the board from the stub server """
+    board_url = '/Boards/{}'.format(generator.board_id)
+
+    def board():
+        return Board(generator.board_id)
+
+    def download(count):
+        for _ in range(count):
+            api.get(board_url)
+
+    def archive(instance):
+        instance.get_archive(stream=True)
+        list(instance.iter_archive_cards())
+
+    return {
+        'get board': (lambda: 5, download),
+        'download board': (lambda: generator.board_id, Board),
+        'stream archive': (board, archive),
+        'prefetch history': (board, lambda instance: instance.prefetch_history(
+            workers=workers))}
+
+
+def measure(setup, function, memory=False):
+    """ Returns the seconds taken by the function given the result of the
+    setup, or the peak of the memory allocated while it runs """
+    argument = setup()
+    if memory:
+        tracemalloc.start()
+    start = perf_counter()
+    function(argument)
+    seconds = perf_counter() - start
+    if not memory:
+        return seconds
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def run(names=(), cards=10000, lanes=200, depth=5, archived=1000, events=10,
+        seed=0, server=False, workers=10, memory=True, output=None):
+    generator = Generator(seed=seed, cards=cards, lanes=lanes, depth=depth,
+                          archived=archived, events=events)
+    print('{} cards, {} archived, {} lanes up to {} deep, {} events per card'
+          .format(cards, archived, lanes, depth, events))
+    if server:
+        stub = StubServer(generator.routes())
+        stub.__enter__()
+        api.base = stub.base
+        tests = server_benchmarks(generator, workers)
+    else:
+        tests = benchmarks(generator)
+    results = {}
+    try:
+        for name, (setup, function) in tests.items():
+            if names and name not in names:
+                continue
+            api.instruments.reset()
+            seconds = measure(setup, function)
+            line = '{:>18}: {:8.3f}s'.format(name, seconds)
+            results[name] = {'seconds': seconds}
+            if server:
+                endpoints = api.instruments.as_dict()['endpoints'].values()
+                requests = sum(stats['requests'] for stats in endpoints)
+                size = sum(stats['bytes'] for stats in endpoints)
+                results[name].update(requests=requests, bytes=size)
+                line += ' {:6.0f} requests/s {:6.1f} MB/s'.format(
+                    requests / seconds, size / 2 ** 20 / seconds)
+            if memory:
+                peak = results[name]['peak'] = measure(setup, function, True)
+                line += ' {:8.1f} MB peak'.format(peak / 2 ** 20)
+            print(line)
+    finally:
+        if server:
+            stub.__exit__()
+    if output:
+        with open(output, 'w') as results_file:
+            json.dump({'parameters': {
+                'cards': cards, 'lanes': lanes, 'depth': depth,
+                'archived': archived, 'events': events, 'seed': seed,
+                'server': server}, 'results': results}, results_file,
+                indent=2)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('names', nargs='*', help='benchmarks to run')
+    for option, default in [('cards', 10000), ('lanes', 200), ('depth', 5),
+                            ('archived', 1000), ('events', 10), ('seed', 0),
+                            ('workers', 10)]:
+        parser.add_argument('--' + option, type=int, default=default)
+    parser.add_argument('--server', action='store_true',
+                        help='download the board from a local stub server')
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help="don't measure the peak memory")
+    parser.add_argument('--json', dest='output',
+                        help='file where the results are written')
+    run(**vars(parser.parse_args()))
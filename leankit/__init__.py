@@ -1,7 +1,7 @@
 from logging import getLogger
+from importlib import import_module
 
 from .connector import api
-from .kanban import Board
 
 
 __author__ = "Guillermo Guirao Aguilar"
@@ -9,6 +9,30 @@ __email__ = "contact@guillermoguiraoaguilar.com"
 __license__ = "MIT"
 __version__ = "1.5.0"
 
+_LAZY_ = {'Board': 'kanban', 'Fleet': 'fleet', 'load_boards': 'fleet',
+          'Watch': 'watch'}
+_SUBMODULES_ = ['config', 'connector', 'dates', 'fleet', 'instruments',
+                'kanban', 'stream', 'watch']
+__all__ = ['api', 'log', 'get_boards', 'get_newer_if_exists'] + \
+    list(_LAZY_) + _SUBMODULES_
+
+
+def __getattr__(name):
+    """ Imports the submodules and their classes when first used """
+    if name in _LAZY_:
+        value = getattr(import_module('.' + _LAZY_[name], __name__), name)
+    elif name in _SUBMODULES_:
+        value = import_module('.' + name, __name__)
+    else:
+        raise AttributeError('module {!r} has no attribute {!r}'.format(
+            __name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
 
 def get_boards():
     log.debug('Getting boards')
@@ -21,6 +45,7 @@ def get_newer_if_exists(board_id, version, timezone='UTC'):
     log.debug('Getting board {} version >{}'.format(board_id, version))
     board = api.get(url.format(board_id, version))
     if board:
+        from .kanban import Board
         return Board(board, timezone)
     else:
         return None
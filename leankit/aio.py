@@ -0,0 +1,44 @@
+import asyncio
+from logging import getLogger
+
+from .connector import AsyncConnector
+from .kanban import Board
+
+
+async def get_boards():
+    log.debug('Getting boards')
+    return await api.get('/Boards')
+
+
+async def get_board(board_id, timezone=None):
+    log.debug('Downloading board {}'.format(board_id))
+    return Board(await api.get('/Boards/{}'.format(board_id)), timezone)
+
+
+async def get_card(board, card_id):
+    url = '/Board/{}/GetCard/{}'.format(board.id, card_id)
+    card_dict = await api.get(url)
+    return board._place_(card_dict)
+
+
+async def get_history(card):
+    """ Downloads the history of a card unless it's already cached """
+    if 'history' not in card.__dict__:
+        url = '/Card/History/{0.board.id}/{0.id}'.format(card)
+        history = card._history_(await api.get(url))
+        card.__dict__.setdefault('history', history)
+    return card.history
+
+
+async def prefetch_history(board, cards=None):
+    """ Downloads the history of several cards concurrently and returns
+    the errors found for each card """
+    cards = list(board.cards.values() if cards is None else cards)
+    results = await asyncio.gather(*[get_history(card) for card in cards],
+                                   return_exceptions=True)
+    return {card: result for card, result in zip(cards, results)
+            if isinstance(result, Exception)}
+
+
+log = getLogger(__name__)
+api = AsyncConnector()
@@ -0,0 +1,144 @@
+import os
+import re
+import json
+import zlib
+import sqlite3
+import logging
+from time import time
+from threading import Lock
+
+from . import config
+
+
+class Cache(object):
+    """ Persistent storage of API responses, backed by SQLite
+
+    Responses are kept for the number of seconds configured for their
+    endpoint in `ttl`, and endpoints not listed there are never stored.
+    Card histories and comments are also valid for as long as the card's
+    `LastActivity` doesn't change, and archives for as long as the board's
+    `Version` doesn't change, as seen in the last downloaded board. """
+
+    ttl = {'/Boards': 3600,
+           '/Boards/{}': 0,
+           '/Board/{}/Archive': 3600,
+           '/Board/{}/ArchiveCards': 3600,
+           '/Card/History/{}/{}': 86400,
+           '/Card/GetComments/{}/{}': 86400}
+    size = 100 * 2 ** 20  # maximum size of the stored data in bytes
+
+    def __init__(self, filename=None, size=None, ttl=None):
+        self.filename = filename or os.path.join(config.folder, 'cache.db')
+        folder = os.path.dirname(self.filename)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.size = size or self.size
+        self.ttl = dict(self.ttl, **(ttl or {}))
+        self.tags = {}
+        self.hits = self.misses = 0
+        self._lock_ = Lock()
+        self._db_ = sqlite3.connect(self.filename, check_same_thread=False)
+        self._db_.execute('CREATE TABLE IF NOT EXISTS responses (url TEXT '
+                          'PRIMARY KEY, tag TEXT, data BLOB, size INTEGER, '
+                          'created REAL, accessed REAL)')
+
+    def __contains__(self, url):
+        return self.route(url) in self.ttl
+
+    @staticmethod
+    def route(url):
+        return re.sub(r'/\d+', '/{}', url)
+
+    def get(self, url, fresh=True):
+        """ Returns the stored response for the url or raises KeyError.
+        With `fresh=False`, expired responses are returned as well """
+        with self._lock_:
+            row = self._db_.execute('SELECT tag, data, created FROM responses '
+                                    'WHERE url = ?', (url,)).fetchone()
+            if row and (not fresh or self._valid_(url, *row)):
+                self._db_.execute('UPDATE responses SET accessed = ? '
+                                  'WHERE url = ?', (time(), url))
+                self._db_.commit()
+                if fresh:
+                    self.hits += 1
+                return json.loads(zlib.decompress(row[1]).decode())
+        if fresh:
+            self.misses += 1
+        raise KeyError(url)
+
+    def set(self, url, data):
+        """ Stores a response, if its endpoint is cacheable, and keeps
+        track of the versions of the board and cards it contains """
+        self._learn_(url, data)
+        if url not in self:
+            return
+        blob = zlib.compress(json.dumps(data).encode())
+        now = time()
+        with self._lock_:
+            self._db_.execute('REPLACE INTO responses VALUES (?, ?, ?, ?, ?, '
+                              '?)', (url, self.tags.get(url), blob, len(blob),
+                                     now, now))
+            self._evict_()
+            self._db_.commit()
+
+    def clear(self):
+        with self._lock_:
+            self._db_.execute('DELETE FROM responses')
+            self._db_.commit()
+
+    @property
+    def stats(self):
+        with self._lock_:
+            entries, size = self._db_.execute('SELECT COUNT(*), SUM(size) '
+                                              'FROM responses').fetchone()
+        return {'hits': self.hits, 'misses': self.misses,
+                'entries': entries, 'size': size or 0}
+
+    def _valid_(self, url, tag, data, created):
+        if url in self.tags:
+            return tag == self.tags[url]
+        return time() - created < self.ttl[self.route(url)]
+
+    def _evict_(self):
+        total = self._db_.execute('SELECT SUM(size) FROM responses')
+        excess = (total.fetchone()[0] or 0) - self.size
+        if excess > 0:
+            rows = self._db_.execute('SELECT url, size FROM responses '
+                                     'ORDER BY accessed, rowid')
+            urls = []
+            for url, size in rows.fetchall():
+                if excess <= 0:
+                    break
+                urls.append((url,))
+                excess -= size
+            log.debug('Evicting {} responses from cache'.format(len(urls)))
+            self._db_.executemany('DELETE FROM responses WHERE url = ?', urls)
+
+    def _learn_(self, url, data):
+        route = self.route(url)
+        board_id = (re.findall(r'\d+', url) or [None])[0]
+        if route == '/Board/{}/BoardVersion/{}/GetNewerIfExists' and data:
+            return self.set('/Boards/{}'.format(board_id), data)
+        elif route == '/Boards/{}':
+            for key in ['Archive', 'ArchiveCards']:
+                self.tags['/Board/{}/{}'.format(board_id, key)] = \
+                    str(data['Version'])
+            lanes = data['Lanes'] + data['Backlog'] + data['Archive']
+            cards = [card for lane in lanes for card in lane['Cards']]
+        elif route == '/Board/{}/Archive':
+            lanes = [data[0]['Lane']] + [lane['Lane'] for lane
+                                         in data[0]['ChildLanes']]
+            cards = [card for lane in lanes for card in lane['Cards']]
+        elif route == '/Board/{}/ArchiveCards':
+            cards = data
+        elif route == '/Board/{}/GetCard/{}':
+            cards = [data]
+        else:
+            return
+        for card in cards:
+            for key in ['History', 'GetComments']:
+                url = '/Card/{}/{}/{}'.format(key, board_id, card['Id'])
+                self.tags[url] = card['LastActivity']
+
+
+log = logging.getLogger(__name__)
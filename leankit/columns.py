@@ -0,0 +1,99 @@
+""" Columnar export of board data as NumPy arrays, for vectorized analysis
+
+Categorical columns (`Lane`, `Type`, `User`, `ClassOfService`, `ToLane`,
+`FromLane`) hold the position of each id within the sorted arrays returned
+by `categories`, or -1 if the id is unknown. Missing integers are -1 as
+well. Dates are naive, as given by LeanKit, and missing ones are NaT.
+Requires numpy. """
+import numpy as np
+
+from .dates import EVENT, parse_date, parse_datetime
+
+
+INTEGERS = ['Id', 'LaneId', 'TypeId', 'AssignedUserId', 'ClassOfServiceId',
+            'Priority', 'Size', 'Index', 'Version']
+BOOLEANS = ['IsBlocked', 'Active']
+STRINGS = ['Title', 'ExternalCardID', 'Tags']
+
+
+def categories(board):
+    """ Sorted ids of the lanes, card types, users and classes of service """
+    return {'Lane': np.array(sorted(board.lanes), dtype=np.int64),
+            'Type': np.array(sorted(board.card_types), dtype=np.int64),
+            'User': np.array(sorted(board.users), dtype=np.int64),
+            'ClassOfService': np.array(sorted(board.classes_of_service),
+                                       dtype=np.int64)}
+
+
+def cards(board, cards=None):
+    """ Returns a dictionary of equally long arrays, one per card field """
+    cards = list(board.cards.values() if cards is None else cards)
+    index = categories(board)
+    columns = {}
+    for key in INTEGERS:
+        columns[key] = _integers_([card.get(key) for card in cards])
+    for key in BOOLEANS:
+        columns[key] = np.array([bool(card.get(key)) for card in cards])
+    for key in STRINGS:
+        columns[key] = np.array([card.get(key) for card in cards],
+                                dtype=object)
+    for key, kind in cards[0]._attrs_.items() if cards else []:
+        values = [card.get(key) for card in cards]
+        if kind == 'date':
+            columns[key] = _dates_(values, parse_date, 'datetime64[D]')
+        elif kind == 'datetime':
+            columns[key] = _dates_(values, parse_datetime, 'datetime64[s]')
+    columns['Lane'] = _codes_(columns['LaneId'], index['Lane'])
+    columns['Type'] = _codes_(columns['TypeId'], index['Type'])
+    columns['User'] = _codes_(columns['AssignedUserId'], index['User'])
+    columns['ClassOfService'] = _codes_(columns['ClassOfServiceId'],
+                                        index['ClassOfService'])
+    return columns
+
+
+def events(board, cards=None):
+    """ Returns a dictionary of equally long arrays with the history events
+    of the given cards, read from their data. The histories that aren't
+    cached yet are downloaded, without building their events """
+    cards = board.cards.values() if cards is None else cards
+    events = [event for card in cards for event in card._events_()]
+    index = categories(board)
+    columns = {
+        'CardId': _integers_([event.get('CardId') for event in events]),
+        'Type': np.array([event.get('Type') for event in events],
+                         dtype=object),
+        'DateTime': _dates_([event.get('DateTime') for event in events],
+                            lambda value: parse_datetime(value, None, EVENT),
+                            'datetime64[s]'),
+        'UserId': _integers_([event.get('UserId') for event in events]),
+        'ToLaneId': _integers_([event.get('ToLaneId') for event in events]),
+        'FromLaneId': _integers_([event.get('FromLaneId')
+                                  for event in events])}
+    columns['User'] = _codes_(columns['UserId'], index['User'])
+    columns['ToLane'] = _codes_(columns['ToLaneId'], index['Lane'])
+    columns['FromLane'] = _codes_(columns['FromLaneId'], index['Lane'])
+    return columns
+
+
+def _integers_(values):
+    return np.array([-1 if value is None else int(value) for value in values],
+                    dtype=np.int64)
+
+
+def _dates_(values, parse, dtype):
+    """ Parses each distinct value only once """
+    values = np.array([value or '' for value in values], dtype=object)
+    if not len(values):
+        return np.array([], dtype=dtype)
+    unique, inverse = np.unique(values, return_inverse=True)
+    parsed = np.array([parse(value) if value else None for value in unique],
+                      dtype=dtype)
+    return parsed[inverse.reshape(-1)]
+
+
+def _codes_(ids, categories):
+    if not len(categories):
+        return np.full(len(ids), -1, dtype=np.int32)
+    positions = np.searchsorted(categories, ids)
+    found = categories[np.minimum(positions, len(categories) - 1)] == ids
+    return np.where(found, positions, -1).astype(np.int32)
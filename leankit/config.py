@@ -7,12 +7,25 @@ def save():  # pragma: no cover
     if not os.path.exists(folder):
         log.debug('Creating new config folder')
         os.makedirs(folder)
-    creds = {key: input(key.capitalize() + ': ') for key in credentials}
+    creds = {key: input(key.capitalize() + ': ') for key in KEYS}
     with open(filename, 'w') as conf:
         json.dump(creds, conf, indent=2)
         log.debug('Credentials stored at {}'.format(filename))
 
 
+def __getattr__(name):
+    """ Reads the credentials when they are first used rather than when
+    the module is imported """
+    if name == 'credentials':
+        credentials = {key: os.getenv('LEANKIT_' + key.upper())
+                       for key in KEYS}
+        credentials.update(load() or {})
+        globals()['credentials'] = credentials
+        return credentials
+    raise AttributeError('module {!r} has no attribute {!r}'.format(
+        __name__, name))
+
+
 def load():  # pragma: no cover
     if os.path.exists(filename):
         log.debug("Loading user credentials")
@@ -26,9 +39,7 @@ def load():  # pragma: no cover
 log = logging.getLogger(__name__)
 folder = os.path.expanduser('~/.config/leankit')
 filename = os.path.join(folder, 'config.json')
-credentials = {key: os.getenv('LEANKIT_' + key.upper()) for key in
-               ['domain', 'username', 'password']}
-credentials.update(load() or {})
+KEYS = ['domain', 'username', 'password']
 
 
 if __name__ == "__main__":  # pragma: no cover
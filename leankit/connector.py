@@ -1,22 +1,342 @@
+import re
 import logging
-import requests
+import codecs
+import marshal
+from time import time, sleep, monotonic, perf_counter
+from random import uniform
+from threading import Lock, local
 
 from . import config
+from .stream import items, select
+from .instruments import Instruments
+
+# requests, asyncio and the rest of the heavier modules are imported when
+# first needed, so that importing leankit stays fast
+
+
+class ThreadSession(object):
+    """ Gives each thread its own requests.Session, since they aren't safe
+    to share: every request updates the cookies of the session. All of them
+    use the credentials in `auth` and share an adapter, whose pool of up to
+    `size` connections per host can be used from several threads """
+
+    def __init__(self, size=32):
+        from requests.adapters import HTTPAdapter
+        self.auth = None
+        self.adapter = HTTPAdapter(pool_maxsize=size)
+        self._local_ = local()
+
+    @property
+    def current(self):
+        """ Session of the current thread, created on first use """
+        session = getattr(self._local_, 'session', None)
+        if session is None:
+            import requests
+            session = self._local_.session = requests.Session()
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+        session.auth = self.auth
+        return session
+
+    def get(self, url, **kwargs):
+        return self.current.get(url, **kwargs)
+
+    def close(self):
+        self.adapter.close()
+
+
+class SharedSession(object):
+    """ ThreadSession shared by every connector, created on first use.
+    Connectors may still be given their own `session` """
+
+    def __init__(self):
+        self.session = None
+        self._lock_ = Lock()
+
+    def __get__(self, obj, cls):
+        if self.session is None:
+            with self._lock_:
+                if self.session is None:
+                    self.session = ThreadSession()
+        return self.session
 
 
 class Connector(object):
-    session = requests.Session()
+    """ Client of LeanKit's API. Failed requests and those rejected with
+    one of the `RETRY` status codes are attempted up to `retries` more
+    times, and a RateLimiter, if given, limits the pace of all attempts.
+    Every attempt and cache lookup is measured by `instruments`.
+
+    Identical requests made by several threads at the same time are sent
+    only once, and their reply is also reused for `ttl` seconds.
+
+    Responses are compressed with any encoding that can be decoded, and
+    if `conditional`, the latest replies that came with an ETag or
+    Last-Modified header, up to `VALIDATORS` bytes, are kept to ask the
+    server to send them only if they changed.
+
+    Unless `authenticate` is called, the credentials are taken from the
+    configuration when the first request is made """
+
+    session = SharedSession()
+    base = None
+    cache = None
+    RETRY = (429, 500, 502, 503, 504)
+    CHUNK = 2 ** 16  # bytes read at a time from streamed responses
+    ENCODING = None  # urllib3's: gzip and deflate, br if brotli is installed
+    VALIDATORS = 2 ** 24  # bytes of the replies kept to be revalidated
+    WAIT = 300  # most seconds waited before retrying, whatever the server says
+
+    def __init__(self, retries=3, backoff=0.5, limiter=None,
+                 instruments=None, ttl=0, conditional=True):
+        self.retries = retries
+        self.backoff = backoff
+        self.limiter = limiter
+        self.instruments = instruments or Instruments()
+        self.ttl = ttl
+        self.conditional = conditional
+        self.stats = {'retries': 0, 'throttled': 0, 'wait': 0.0}
+        self._flights_ = {}
+        self._validators_ = {}  # etag, last modified and reply by url
+        self._validated_ = 0  # bytes of the replies in _validators_
+        self._lock_ = Lock()
 
     def authenticate(self, domain, username, password):
         self.session.auth = (username, password)
         self.base = 'https://{}.leankit.com/kanban/api'.format(domain)
 
     def get(self, url):
+        """ Returns the data of the reply, waiting for an identical
+        request in flight or reusing a recent reply if there is one """
+        from concurrent.futures import Future
+        with self._lock_:
+            flight = self._flights_.get(url)
+            if flight is None or flight.expires < monotonic():
+                if self.ttl:
+                    now = monotonic()
+                    self._flights_ = {key: value for key, value
+                                      in self._flights_.items()
+                                      if value.expires >= now}
+                leader, flight = True, Future()
+                flight.expires, flight.shared = float('inf'), 0
+                self._flights_[url] = flight
+            else:
+                leader, flight.shared = False, flight.shared + 1
+        if not leader:
+            self.instruments.share(url)
+            return marshal.loads(flight.result())
+        try:
+            response = self._fetch_(url)
+        except BaseException as exception:
+            with self._lock_:
+                if self._flights_.get(url) is flight:
+                    del self._flights_[url]
+            flight.set_exception(exception)
+            raise
+        with self._lock_:
+            flight.expires = monotonic() + self.ttl
+            if not self.ttl and self._flights_.get(url) is flight:
+                del self._flights_[url]
+            shared = flight.shared or self.ttl
+        # shared replies are copied, since each caller may modify its own
+        flight.set_result(marshal.dumps(response) if shared else None)
+        return marshal.loads(flight.result()) if shared else response
+
+    def _fetch_(self, url):
+        if self.cache is None or url not in self.cache:
+            response = self._get_(url)
+        else:
+            try:
+                response = self.cache.get(url)
+            except KeyError:
+                self.instruments.cache(url, hit=False)
+                response = self._revalidate_(url)
+            else:
+                self.instruments.cache(url, hit=True)
+                return response
+        if self.cache is not None:
+            self.cache.set(url, response)
+        return response
+
+    def stream(self, url, *paths):
+        """ Yields the parts of the response at any of the given paths, as
+        (path, value) pairs, decoding them as the response is downloaded
+
+        Paths are relative to the data of the reply, see `stream.items`.
+        Cacheable urls are downloaded as a whole when a cache is in use """
+        if self.cache is not None and url in self.cache:
+            # not self.get, which is a coroutine in AsyncConnector
+            yield from select(Connector.get(self, url), *paths)
+            return
+        prefix = 'ReplyData.item'
+        paths = [prefix + ('.' + path if path else '') for path in paths]
+        request = self._get_(url, stream=True)
+        try:
+            if not request.ok:
+                msg = 'Server responded with code {0.status_code}'
+                raise ConnectionError(msg.format(request))
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            chunks = (decoder.decode(chunk) for chunk
+                      in request.iter_content(self.CHUNK))
+            reply = {}
+            for path, value in items(chunks, 'ReplyCode', 'ReplyText', *paths):
+                if path in ('ReplyCode', 'ReplyText'):
+                    reply[path] = value
+                else:
+                    yield path[len(prefix) + 1:], value
+        except ValueError:
+            raise IOError("Invalid response")
+        finally:
+            request.close()
+        if reply.get('ReplyCode') != 200:
+            raise ConnectionError("Error {}: {}".format(
+                reply.get('ReplyCode'), reply.get('ReplyText')))
+
+    def _revalidate_(self, url):
+        """ Downloads a board only if there is a newer version than the one
+        stored in the cache """
+        match = re.fullmatch(r'/Boards/(\d+)', url)
+        if match:
+            try:
+                board = self.cache.get(url, fresh=False)
+            except KeyError:
+                pass
+            else:
+                newer = '/Board/{}/BoardVersion/{}/GetNewerIfExists'
+                return self._get_(newer.format(
+                    match.group(1), board['Version'])) or board
+        return self._get_(url)
+
+    def _get_(self, url, stream=False, conditional=True):
+        from urllib3.util.request import ACCEPT_ENCODING
         log.debug('GET {}'.format(url))
+        if self.base is None:
+            self.authenticate(**config.credentials)
+        headers = {'Accept-Encoding': self.ENCODING or ACCEPT_ENCODING}
+        if conditional:
+            kept = None if stream else self._conditions_(url, headers)
+        else:
+            kept, headers['Cache-Control'] = None, 'no-cache'
+        for attempt in range(self.retries + 1):
+            if self.limiter:
+                self._wait_(self.limiter.reserve())
+            start = perf_counter()
+            try:
+                request = self.session.get(self.base + url, verify=True,
+                                           stream=stream, headers=headers)
+            except Exception as exception:
+                msg = "Unable to make request: {}".format(exception)
+                error = ConnectionError(msg)
+                delay = self._backoff_(attempt)
+                status = None
+            else:
+                if request.status_code == 304 and not kept and conditional:
+                    log.warning('{} not modified, but no reply was kept for '
+                                'it, downloading it again'.format(url))
+                    return self._get_(url, stream, conditional=False)
+                if request.status_code not in self.RETRY:
+                    return self._receive_(url, request, start, stream, kept)
+                msg = 'Server responded with code {0.status_code}'
+                error = ConnectionError(msg.format(request))
+                delay = self._backoff_(attempt, request)
+                status = request.status_code
+                request.close()
+            self.instruments.request(url, perf_counter() - start, status,
+                                     error=True,
+                                     retry=attempt < self.retries)
+            if attempt == self.retries:
+                raise error
+            log.warning('{}, retrying in {:.1f}s'.format(error, delay))
+            self._count_('retries')
+            self._wait_(delay)
+
+    def _receive_(self, url, request, start, stream, kept=None):
+        """ Returns the reply, or the response itself if it's to be
+        streamed, or the kept reply if it wasn't modified, and records how
+        long it took and its size """
+        seconds = perf_counter() - start
+        if stream:
+            size = int(request.headers.get('Content-Length', 0))
+            self.instruments.request(url, seconds, request.status_code, size)
+            return request
+        if request.status_code == 304 and kept:
+            self.instruments.request(url, seconds, 304)
+            return marshal.loads(kept)
+        size, error = len(request.content), True
+        transferred = int(request.headers.get('Content-Length', size))
+        start = perf_counter()
         try:
-            request = self.session.get(self.base + url, verify=True)
-        except Exception as error:
-            raise ConnectionError("Unable to make request: {}".format(error))
+            reply = self._reply_(request)
+            self._validate_(url, request, reply)
+            error = False
+            return reply
+        finally:
+            self.instruments.request(url, seconds, request.status_code, size,
+                                     perf_counter() - start, error,
+                                     transferred=transferred)
+
+    def _conditions_(self, url, headers):
+        """ Adds the headers asking for the url only if it changed since the
+        reply that was kept, and returns that reply, serialized, if any """
+        with self._lock_:
+            etag, modified, kept = self._validators_.get(url, (None,) * 3)
+        if etag:
+            headers['If-None-Match'] = etag
+        if modified:
+            headers['If-Modified-Since'] = modified
+        return kept
+
+    def _validate_(self, url, request, reply):
+        """ Keeps the reply along with its validators, if it has any,
+        dropping the oldest ones kept beyond `VALIDATORS` bytes """
+        etag = request.headers.get('ETag')
+        modified = request.headers.get('Last-Modified')
+        kept = marshal.dumps(reply) if self.conditional and \
+            (etag or modified) else None
+        with self._lock_:
+            previous = self._validators_.pop(url, None)
+            if previous:
+                self._validated_ -= len(previous[2])
+            if kept is None or len(kept) > self.VALIDATORS:
+                return
+            while self._validated_ + len(kept) > self.VALIDATORS:
+                oldest = self._validators_.pop(next(iter(self._validators_)))
+                self._validated_ -= len(oldest[2])
+            self._validators_[url] = (etag, modified, kept)
+            self._validated_ += len(kept)
+
+    def _backoff_(self, attempt, request=None):
+        """ Returns the seconds to wait before retrying a request, as asked
+        by the server, up to `WAIT`, or following an exponential backoff
+        with jitter if it didn't ask or its date can't be read """
+        if request is not None and request.status_code == 429:
+            self._count_('throttled')
+        after = None if request is None else \
+            request.headers.get('Retry-After')
+        if after:
+            try:
+                return min(self.WAIT, max(0, float(after)))
+            except ValueError:
+                pass
+            from email.utils import parsedate_to_datetime
+            try:
+                date = parsedate_to_datetime(after)
+                return min(self.WAIT, max(0, date.timestamp() - time()))
+            except (TypeError, ValueError, IndexError, OverflowError):
+                log.debug('Invalid Retry-After header: {}'.format(after))
+        return min(self.WAIT, uniform(0, self.backoff * 2 ** attempt))
+
+    def _wait_(self, seconds):
+        if seconds > 0:
+            self._count_('wait', seconds)
+            sleep(seconds)
+
+    def _count_(self, name, value=1):
+        with self._lock_:
+            self.stats[name] += value
+
+    @staticmethod
+    def _reply_(request):
         if request.ok:
             try:
                 response = request.json()
@@ -33,6 +353,45 @@ class Connector(object):
             raise ConnectionError(msg)
 
 
+class AsyncConnector(Connector):
+    """ Connector whose requests can be awaited, allowing up to `size`
+    concurrent connections """
+
+    def __init__(self, size=10, **kwargs):
+        from concurrent.futures import ThreadPoolExecutor
+        super().__init__(**kwargs)
+        self.session = ThreadSession(size)
+        self.executor = ThreadPoolExecutor(max_workers=size)
+
+    async def get(self, url):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, super().get, url)
+
+
+class RateLimiter(object):
+    """ Token bucket allowing `rate` requests per second on average
+    and bursts of up to `burst` requests """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = monotonic()
+        self._lock_ = Lock()
+
+    def reserve(self):
+        """ Takes a token and returns the seconds to wait until it's valid """
+        with self._lock_:
+            now = monotonic()
+            self.tokens = min(self.burst, self.tokens +
+                              (now - self.updated) * self.rate) - 1
+            self.updated = now
+            return max(0, -self.tokens / self.rate)
+
+    def wait(self):
+        sleep(self.reserve())
+
+
 log = logging.getLogger(__name__)
 api = Connector()
-api.authenticate(**config.credentials)
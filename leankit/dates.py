@@ -0,0 +1,71 @@
+import re
+from datetime import date, datetime
+from functools import lru_cache
+
+
+DATE = '%m/%d/%Y'
+DATETIME = '%m/%d/%Y %I:%M:%S %p'
+EVENT = '%m/%d/%Y at %I:%M:%S %p'  # format of the dates in card history
+PATTERNS = {DATE: re.compile(r'(\d\d?)/(\d\d?)/(\d{4})'),
+            DATETIME: re.compile(r'(\d\d?)/(\d\d?)/(\d{4}) '
+                                 r'(\d\d?):(\d\d?):(\d\d?) ([AP]M)'),
+            EVENT: re.compile(r'(\d\d?)/(\d\d?)/(\d{4}) at '
+                              r'(\d\d?):(\d\d?):(\d\d?) ([AP]M)')}
+
+
+@lru_cache(maxsize=2 ** 16)
+def parse_date(value):
+    """ Equivalent to `datetime.strptime(value, DATE).date()` """
+    match = PATTERNS[DATE].fullmatch(value)
+    if match:
+        month, day, year = match.groups()
+        return date(int(year), int(month), int(day))
+    return datetime.strptime(value, DATE).date()
+
+
+@lru_cache(maxsize=2 ** 16)
+def parse_datetime(value, timezone=None, fmt=DATETIME):
+    """ Equivalent to `datetime.strptime(value, fmt)`, localized to the
+    given timezone, for the datetime formats used by LeanKit """
+    match = PATTERNS[fmt].fullmatch(value)
+    if match and 1 <= int(match.group(4)) <= 12:
+        month, day, year, hour, minute, second, meridian = match.groups()
+        hour = int(hour) % 12 + (12 if meridian == 'PM' else 0)
+        time = datetime(int(year), int(month), int(day), hour, int(minute),
+                        int(second))
+    else:
+        time = datetime.strptime(value, fmt)
+    return localize(time, timezone) if timezone else time
+
+
+def timezone(name):
+    """ Returns the timezone with the given name, from zoneinfo or, before
+    Python 3.9, from pytz """
+    try:
+        from zoneinfo import ZoneInfo
+    except ImportError:  # pragma: no cover
+        from pytz import timezone as tz
+        return tz(name)
+    return ZoneInfo(name)
+
+
+def localize(time, timezone):
+    """ Equivalent to pytz's `timezone.localize(time)`, reusing the offset
+    found for the same hour if it doesn't change within that hour. Times
+    that are ambiguous or don't exist are taken as standard time, as pytz
+    does, also for zoneinfo timezones """
+    if not hasattr(timezone, 'localize'):
+        time = time.replace(tzinfo=timezone)
+        other = time.replace(fold=1)
+        if other.utcoffset() != time.utcoffset() and not other.dst():
+            return other
+        return time
+    tzinfo = _offset_(timezone, time.year, time.month, time.day, time.hour)
+    return time.replace(tzinfo=tzinfo) if tzinfo else timezone.localize(time)
+
+
+@lru_cache(maxsize=2 ** 16)
+def _offset_(timezone, year, month, day, hour):
+    start = timezone.localize(datetime(year, month, day, hour))
+    end = timezone.localize(datetime(year, month, day, hour, 59, 59))
+    return start.tzinfo if start.tzinfo is end.tzinfo else None
@@ -0,0 +1,104 @@
+from time import perf_counter
+from logging import getLogger
+from operator import methodcaller
+
+from .kanban import Board, _concurrently_
+
+
+class Fleet(object):
+    """ Collection of boards sharing a single object for each user, card
+    type and class of service that is identical across them
+
+    Only identical elements are shared, so users with a different role or
+    WIP limit on each board are kept apart, and the board of a shared
+    element is the first one that had it. Shared elements are never
+    updated in place: a board that is refreshed gets new objects for those
+    that changed, leaving the rest of the boards untouched """
+
+    SHARED = ['BoardUsers', 'CardTypes', 'ClassesOfService']
+
+    def __init__(self, boards=()):
+        self.boards = {}
+        self._shared_ = {}
+        self._stats_ = {'loaded': 0, 'failed': 0, 'refreshed': 0,
+                        'shared': 0, 'seconds': 0.0}
+        for board in boards:
+            self.add(board)
+
+    def __repr__(self):
+        return '<{} of {} boards>'.format(self.__class__.__name__,
+                                          len(self.boards))
+
+    def __iter__(self):
+        return iter(self.boards.values())
+
+    def __len__(self):
+        return len(self.boards)
+
+    def add(self, board):
+        """ Adds a board, replacing its elements with the shared ones """
+        for key in self.SHARED:
+            items = board[key]
+            for item_id, item in list(items.items()):
+                shared = self._shared_.setdefault((key, item_id), item)
+                if shared is not item and shared == item and \
+                        type(shared) is type(item):
+                    items[item_id] = shared
+                    self._stats_['shared'] += 1
+        board._reset_()
+        self.boards[board.id] = board
+        return board
+
+    def load(self, board_ids, workers=10, **kwargs):
+        """ Downloads several boards concurrently and adds them, passing
+        any other arguments to Board. Returns the errors of each board """
+        start = perf_counter()
+        boards, errors = _concurrently_(
+            lambda board_id: Board(board_id, **kwargs), board_ids, workers,
+            'Failed to load board {}: {}')
+        for board in boards.values():
+            self.add(board)
+        self._stats_['loaded'] += len(boards)
+        self._stats_['failed'] += len(errors)
+        self._stats_['seconds'] += perf_counter() - start
+        return errors
+
+    def refresh(self, workers=10):
+        """ Brings all boards up to date concurrently and returns the
+        changes of each board that has a newer version, or its error """
+        start = perf_counter()
+        changes, errors = _concurrently_(
+            methodcaller('refresh'), list(self), workers,
+            'Failed to refresh board {0.id}: {1}')
+        results = {board: result for board, result in changes.items()
+                   if result}
+        for board in results:
+            self.add(board)
+        self._stats_['refreshed'] += len(results)
+        self._stats_['failed'] += len(errors)
+        results.update(errors)
+        self._stats_['seconds'] += perf_counter() - start
+        return results
+
+    def find_card(self, card_id):
+        """ Returns the card with the given id from any board, or None """
+        for board in self:
+            if card_id in board.cards:
+                return board.cards[card_id]
+        return None
+
+    @property
+    def stats(self):
+        return dict(self._stats_, boards=len(self.boards),
+                    lanes=sum(len(board.lanes) for board in self),
+                    cards=sum(len(board.cards) for board in self))
+
+
+def load_boards(board_ids, workers=10, **kwargs):
+    """ Returns a Fleet with the given boards, downloaded concurrently """
+    fleet = Fleet()
+    fleet.load(board_ids, workers, **kwargs)
+    return fleet
+
+
+log = getLogger(__name__)
@@ -0,0 +1,152 @@
+""" Measurements of the requests made to the API and of the time taken to
+build boards, to find out where time goes without a profiler """
+import re
+from threading import Lock
+
+BUCKETS = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, float('inf'))
+COUNTERS = ['requests', 'errors', 'retries', 'not_modified', 'cache_hits',
+            'cache_misses', 'shared', 'bytes', 'transferred', 'seconds',
+            'decode']
+METRICS = [('errors', 'errors_total', 'Failed requests'),
+           ('retries', 'retries_total', 'Requests that were retried'),
+           ('not_modified', 'not_modified_total',
+            'Requests answered with 304 Not Modified'),
+           ('cache_hits', 'cache_hits_total', 'Responses found in the cache'),
+           ('cache_misses', 'cache_misses_total',
+            'Responses missing from the cache'),
+           ('shared', 'shared_total',
+            'Replies shared with identical requests'),
+           ('bytes', 'response_bytes_total', 'Size of the responses'),
+           ('transferred', 'transferred_bytes_total',
+            'Size of the responses as sent, possibly compressed'),
+           ('decode', 'decode_seconds_total', 'Time spent decoding JSON')]
+
+
+def endpoint(url):
+    """ Returns the url with its ids replaced, e.g. /Boards/{} """
+    return re.sub(r'/\d+', '/{}', url.split('?')[0])
+
+
+class Instruments(object):
+    """ Per endpoint counters and latency histograms of the requests made
+    by a connector, next to the seconds spent in each phase of building
+    boards. Can be exported with `as_dict` or `prometheus`.
+
+    Every measurement is also passed to each of the `hooks` as a
+    dictionary with its `kind` ('request', 'cache', 'share' or 'board') """
+
+    def __init__(self, hooks=()):
+        self.hooks = list(hooks)
+        self._lock_ = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock_:
+            self.endpoints = {}
+            self.phases = {}
+            self.boards = 0
+
+    def _endpoint_(self, url):
+        name = endpoint(url)
+        if name not in self.endpoints:
+            self.endpoints[name] = dict.fromkeys(COUNTERS, 0)
+            self.endpoints[name]['buckets'] = [0] * len(BUCKETS)
+        return self.endpoints[name]
+
+    def _notify_(self, record):
+        for hook in self.hooks:
+            hook(record)
+
+    def request(self, url, seconds, status=None, size=0, decode=0.0,
+                error=False, retry=False, transferred=None):
+        """ Records an attempt to download the url. The `transferred`
+        bytes, if compressed, are smaller than the `size` of the response """
+        transferred = size if transferred is None else transferred
+        with self._lock_:
+            stats = self._endpoint_(url)
+            stats['requests'] += 1
+            stats['errors'] += bool(error)
+            stats['retries'] += bool(retry)
+            stats['not_modified'] += status == 304
+            stats['bytes'] += size
+            stats['transferred'] += transferred
+            stats['seconds'] += seconds
+            stats['decode'] += decode
+            for index, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats['buckets'][index] += 1
+                    break
+        self._notify_({'kind': 'request', 'url': url, 'status': status,
+                       'seconds': seconds, 'bytes': size,
+                       'transferred': transferred, 'decode': decode,
+                       'error': error, 'retry': retry})
+
+    def cache(self, url, hit):
+        """ Records a lookup of the url in the cache """
+        with self._lock_:
+            stats = self._endpoint_(url)
+            stats['cache_hits' if hit else 'cache_misses'] += 1
+        self._notify_({'kind': 'cache', 'url': url, 'hit': hit})
+
+    def share(self, url):
+        """ Records a reply reused from an identical request """
+        with self._lock_:
+            self._endpoint_(url)['shared'] += 1
+        self._notify_({'kind': 'share', 'url': url})
+
+    def board(self, timings):
+        """ Records the seconds taken by each phase of building a board """
+        with self._lock_:
+            self.boards += 1
+            for phase, seconds in timings.items():
+                self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        self._notify_(dict(timings, kind='board'))
+
+    def as_dict(self):
+        with self._lock_:
+            endpoints = {}
+            for name, stats in self.endpoints.items():
+                stats = endpoints[name] = dict(stats)
+                counts, total = [], 0
+                for bound, count in zip(BUCKETS, stats.pop('buckets')):
+                    total += count
+                    counts.append((bound, total))
+                stats['histogram'] = counts
+            return {'endpoints': endpoints, 'boards': self.boards,
+                    'phases': dict(self.phases)}
+
+    def prometheus(self, prefix='leankit'):
+        """ Returns the measurements in Prometheus' text exposition format """
+        data = self.as_dict()
+        endpoints = sorted(data['endpoints'].items())
+        lines = []
+
+        def header(name, kind, description):
+            lines.append('# HELP {}_{} {}'.format(prefix, name, description))
+            lines.append('# TYPE {}_{} {}'.format(prefix, name, kind))
+
+        def sample(name, value, **labels):
+            labels = ','.join('{}="{}"'.format(*pair)
+                              for pair in labels.items())
+            lines.append('{}_{}{} {}'.format(
+                prefix, name, '{' + labels + '}' if labels else '', value))
+
+        header('request_seconds', 'histogram', 'Latency of the requests')
+        for name, stats in endpoints:
+            for bound, count in stats['histogram']:
+                bound = '+Inf' if bound == float('inf') else bound
+                sample('request_seconds_bucket', count, endpoint=name,
+                       le=bound)
+            sample('request_seconds_sum', stats['seconds'], endpoint=name)
+            sample('request_seconds_count', stats['requests'], endpoint=name)
+        for key, name, description in METRICS:
+            header(name, 'counter', description)
+            for endpoint_name, stats in endpoints:
+                sample(name, stats[key], endpoint=endpoint_name)
+        header('boards_total', 'counter', 'Boards built')
+        sample('boards_total', data['boards'])
+        header('board_phase_seconds_total', 'counter',
+               'Time spent in each phase of building boards')
+        for phase, seconds in sorted(data['phases'].items()):
+            sample('board_phase_seconds_total', seconds, phase=phase)
+        return '\n'.join(lines) + '\n'
@@ -1,20 +1,54 @@
+from sys import intern
+from array import array
+from bisect import bisect_left
+from time import perf_counter
 from logging import getLogger
-from datetime import datetime
-from pytz import timezone as tz
-from cached_property import cached_property
+from functools import partial
+from operator import attrgetter
+from threading import RLock
+from collections.abc import MutableMapping, Sequence
 
 from . import api
+from .dates import EVENT, parse_date, parse_datetime, localize, \
+    timezone as tz
 
 
 class KanbanError(Exception):
     """ Error thrown when performing a non-valid operation """
 
 
+class cached_property(object):
+    """ Property computed on first access and then stored in the instance,
+    like the one in the cached_property package, which imports asyncio """
+
+    def __init__(self, func):
+        self.__doc__ = func.__doc__
+        self.func = func
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.func.__name__] = self.func(obj)
+        return value
+
+
+class shared_cached_property(cached_property):
+    """ cached_property that keeps the first value stored, so that threads
+    computing it at the same time end up sharing the same object """
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        value = self.func(obj)
+        return obj.__dict__.setdefault(self.func.__name__, value)
+
+
 class Converter(dict):
     _attrs_, _items_ = {}, {}
+    _names_ = {}  # attribute names mapped to their keys
 
     def __init__(self, data, board):
-        super().__init__(**data)
+        super().__init__(board._share_(data) if board.compact else data)
         self.board = board
 
     def __repr__(self):
@@ -24,25 +58,64 @@ class Converter(dict):
         return hash(repr(self))
 
     def __getitem__(self, key):
+        if key in self._attrs_ or key in self._items_:
+            values = self.__dict__.setdefault('_values_', {})
+            if key not in values:
+                values[key] = self._convert_(key)
+            value = values[key]
+            return list(value) if type(value) is list else value
+        return self._raw_(key)
+
+    def _convert_(self, key):
         if key in self._attrs_:
-            value = super().__getitem__(key)
+            value = self._raw_(key)
             return getattr(self, '_' + self._attrs_[key] + '_')(value)
-        elif key in self._items_:
-            if key.endswith('s'):
-                item_ids = self[key[:-1] + 'Ids']
-                return [self.board[self._items_[key]].get(i) for i in item_ids]
-            else:
-                item_id = self[key + 'Id']
-                return self.board[self._items_[key]].get(item_id)
+        elif key.endswith('s'):
+            item_ids = self[key[:-1] + 'Ids']
+            return [self.board[self._items_[key]].get(i) for i in item_ids]
         else:
-            return super().__getitem__(key)
+            item_id = self[key + 'Id']
+            return self.board[self._items_[key]].get(item_id)
+
+    def _raw_(self, key):
+        return dict.__getitem__(self, key)
+
+    def _invalidate_(self):
+        """ Drops the converted values, which are cached on first access """
+        self.__dict__.pop('_values_', None)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._invalidate_()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._invalidate_()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._invalidate_()
+
+    def pop(self, *args):
+        self._invalidate_()
+        return super().pop(*args)
+
+    def setdefault(self, key, default=None):
+        self._invalidate_()
+        return super().setdefault(key, default)
+
+    def clear(self):
+        super().clear()
+        self._invalidate_()
 
     def __getattr__(self, name):
-        key = name.title().replace('_', '')
+        key = self._names_.get(name) or name.title().replace('_', '')
         try:
-            return self[key]
+            value = self[key]
         except KeyError:
             raise AttributeError(name)
+        self._names_[name] = key
+        return value
 
     @staticmethod
     def _list_(value):
@@ -50,21 +123,104 @@ class Converter(dict):
 
     @staticmethod
     def _date_(value):
-        return datetime.strptime(value, "%m/%d/%Y").date() if value else None
+        return parse_date(value) if value else None
 
     def _datetime_(self, value):
-        if value:
-            time = datetime.strptime(value, "%m/%d/%Y %I:%M:%S %p")
-            if self.board.timezone:
-                return self.board.timezone.localize(time)
-            return time
-        return None
+        return parse_datetime(value, self.board.timezone) if value else None
 
     @property
     def raw_data(self):
         return {key: self[key] for key in self.keys()}
 
 
+class Lazy(MutableMapping):
+    """ Mapping of ids to elements of a board, which are built from their
+    data with `build` on first access and kept from then on. The builder
+    may store the element in the mapping itself, as cards do """
+
+    def __init__(self, data, build, lock=None):
+        self._data_ = dict(data)
+        self._pending_ = set(self._data_)
+        self._build_ = build
+        self._lock_ = lock or Guard()
+
+    def __getitem__(self, key):
+        value = self._data_[key]
+        if key in self._pending_:
+            with self._lock_:
+                if key in self._pending_:
+                    value = self._build_(self._data_[key])
+                    if key in self._pending_:
+                        self[key] = value
+                value = self._data_[key]
+        return value
+
+    def __setitem__(self, key, value):
+        with self._lock_:
+            self._data_[key] = value
+            self._pending_.discard(key)
+
+    def __delitem__(self, key):
+        with self._lock_:
+            del self._data_[key]
+            self._pending_.discard(key)
+
+    def pop(self, key, *default):
+        """ Removes the element, returning it, or its data if it hasn't
+        been built yet, since its builder may rely on elements gone too """
+        with self._lock_:
+            self._pending_.discard(key)
+            return self._data_.pop(key, *default)
+
+    def popitem(self):
+        with self._lock_:
+            key, value = self._data_.popitem()
+            self._pending_.discard(key)
+            return key, value
+
+    def __contains__(self, key):
+        return key in self._data_
+
+    def __iter__(self):
+        return iter(self._data_)
+
+    def __len__(self):
+        return len(self._data_)
+
+    def __repr__(self):
+        return '<{} {}/{} loaded>'.format(self.__class__.__name__,
+                                          len(self) - len(self._pending_),
+                                          len(self))
+
+    def loaded(self):
+        """ Returns the elements that have already been built """
+        return [value for key, value in self._data_.items()
+                if key not in self._pending_]
+
+    def peek(self, key, default=None):
+        """ Returns the element if it has been built, or its data otherwise,
+        without building it """
+        return self._data_.get(key, default)
+
+
+class Guard(object):
+    """ Reentrant lock shared by the lazy mappings and the indexes of a board,
+    so that each element and index is built only once. Copies of it are new
+    locks """
+
+    def __init__(self):
+        self._lock_ = RLock()
+
+    def __enter__(self):
+        return self._lock_.__enter__()
+
+    def __exit__(self, *args):
+        return self._lock_.__exit__(*args)
+
+    def __reduce__(self):
+        return self.__class__, ()
+
+
 class User(Converter):
     def __str__(self):
         return self.user_name
@@ -88,10 +244,46 @@ class Event(Converter):
         return '<{0.__class__.__name__}>'.format(self)
 
     def _datetime_(self, value):
-        time = datetime.strptime(value, "%m/%d/%Y at %I:%M:%S %p")
-        if self.board.timezone:
-            return self.board.timezone.localize(time)
-        return time
+        return parse_datetime(value, self.board.timezone, EVENT)
+
+
+class History(Sequence):
+    """ History events of a card, oldest first, built from their data when
+    any of them is first accessed """
+
+    def __init__(self, data, board):
+        self._data_ = data
+        self._events_ = None
+        self.board = board
+
+    def _built_(self):
+        events = self._events_
+        if events is None:
+            with self.board._guard_:
+                if self._events_ is None:
+                    self._events_ = [Event(event, self.board)
+                                     for event in self._data_]
+                events = self._events_
+        return events
+
+    def __getitem__(self, index):
+        return self._built_()[index]
+
+    def __len__(self):
+        return len(self._data_)
+
+    def __iter__(self):
+        return iter(self._built_())
+
+    def __eq__(self, other):
+        return isinstance(other, (list, History)) and list(self) == other
+
+    def __repr__(self):
+        return repr(self._built_())
+
+    @property
+    def raw_data(self):
+        return self._data_
 
 
 class Card(Converter):
@@ -107,16 +299,31 @@ class Card(Converter):
         super().__init__(data, board)
         self.lane = lane
         self.board.cards[self.id] = self
+        if 'indexes' in board.__dict__:
+            board._index_(self)
 
     def __str__(self):
         return str(self.get('ExternalCardID', self.id) or self.id)
 
-    @cached_property
+    @shared_cached_property
     def history(self):
         events = api.get("/Card/History/{0.board.id}/{0.id}".format(self))
-        return [Event(event, self.board) for event in reversed(events)]
+        return self._history_(events)
 
-    @cached_property
+    def _history_(self, events):
+        """ Builds the history from the events as received, newest first """
+        return History(events[::-1], self.board)
+
+    def _events_(self):
+        """ Returns the data of the history events, oldest first, taken
+        from the history if it's cached or downloaded otherwise """
+        history = self.__dict__.get('history')
+        if history is None:
+            url = "/Card/History/{0.board.id}/{0.id}".format(self)
+            return api.get(url)[::-1]
+        return getattr(history, 'raw_data', history)
+
+    @shared_cached_property
     def comments(self):
         return api.get("/Card/GetComments/{0.board.id}/{0.id}".format(self))
 
@@ -124,6 +331,8 @@ class Card(Converter):
 class Lane(Converter):
     _items_ = {'ParentLane': 'Lanes', 'SiblingLanes': 'Lanes',
                'ChildLanes': 'Lanes'}
+    _layout_ = ['Index', 'Width', 'Orientation', 'ParentLaneId',
+                'ChildLaneIds', 'SiblingLaneIds']
     BOX = 40  # height of the swim lane
     WIDTH = 50  # width of the lane
     HEADER = 8  # height of the lane header
@@ -133,18 +342,25 @@ class Lane(Converter):
         super().__init__(data, board)
         self.cards = [Card(card_dict, self, board) for card_dict
                       in data['Cards'] if card_dict['TypeId']]
+        if board.compact:
+            self['Cards'] = self.cards
 
     def __str__(self):
         return self.path
 
     @property
     def path(self):
-        titles = [self.title] + [lane.title for lane in self.ascendants]
-        return '::'.join(reversed(titles))
+        return self.board.tree['path'][self.id]
 
     @property
     def top_lane(self):
-        return ([self] + self.ascendants)[-1]
+        ascendants = self.board.tree['ascendants'][self.id]
+        return self.board.lanes[ascendants[-1]] if ascendants else self
+
+    @property
+    def depth(self):
+        """ Number of parent lanes """
+        return len(self.board.tree['ascendants'][self.id])
 
     @cached_property
     def left_lanes(self):
@@ -166,167 +382,681 @@ class Lane(Converter):
     @property
     def ascendants(self):
         """ Returns a list of all parent lanes sorted in ascending order """
-        lanes = []
-        lane = self.parent_lane
-        while lane:
-            lanes.append(lane)
-            lane = lane.parent_lane
-        return lanes
+        lanes = self.board.lanes
+        return [lanes[i] for i in self.board.tree['ascendants'][self.id]]
 
     @property
     def descendants(self):
         """ Returns a list of all child lanes sorted in descending order """
-        def sublanes(lane, array):
-            for child in lane.child_lanes:
-                array.append(child)
-                sublanes(child, array)
-            return array
+        tree, lanes = self.board.tree, self.board.lanes
+        start = tree['start'][self.id]
+        end = tree['end'][self.id]
+        return [lanes[i] for i in tree['order'][start + 1:end]]
 
-        return sublanes(self, [])
+    def descends_from(self, lane):
+        """ Whether the lane is one of the descendants of the given lane """
+        start, end = self.board.tree['start'], self.board.tree['end']
+        return start[lane.id] < start[self.id] < end[lane.id]
 
-    @cached_property
+    @property
     def left(self):
         """ Distance from the left margin of the board
         to the left side of the lane """
-        if self.orientation == 1:
-            return self.parent_lane.left
-        elif self.left_lanes:
-            left_lane = self.left_lanes[-1]
-            return left_lane.right + self.BORDER
-        elif self.parent_lane:
-            return self.parent_lane.left
-        else:
-            return 0
+        return self.board._position_('left', self)
 
-    @cached_property
+    @property
     def right(self):
         """ Distance from the left margin of the board
         to the right side of the lane """
-        if self.child_lanes:
-            return max([child.right for child in self.child_lanes])
-        else:
-            return self.left + self["Width"] * self.WIDTH
+        return self.board._position_('right', self)
 
-    @cached_property
+    @property
     def top(self):
         """ Distance from the top margin of the board
         to the top side of the lane """
-        if self.orientation == 1 and self.left_lanes:
-            return self.left_lanes[-1].bottom + self.BORDER
-        elif self.parent_lane:
-            return self.parent_lane.top + self.HEADER + self.BORDER
-        else:
-            return 0
+        return self.board._position_('top', self)
 
-    @cached_property
+    @property
     def bottom(self):
         """ Distance from the top margin of the board
         to the bottom side of the lane """
-        if self.child_lanes:
-            return max([child.bottom for child in self.child_lanes])
-        else:
-            return self.top + self.HEADER + self.BORDER + self.BOX
+        return self.board._position_('bottom', self)
 
-    @cached_property
+    @property
     def width(self):
         """ Total width of the lane, including margins of all child lanes """
         return self.right - self.left
 
-    @cached_property
+    @property
     def height(self):
         """ Total height of the lane within the board """
-        if self.parent_lane:
-            last_lane = len(self.left_lanes) == len(self.sibling_lanes)
-            if self.orientation == 0 or last_lane:
-                difference = self.top - self.parent_lane.top
-                return self.parent_lane.height - difference
-            else:
-                return self.bottom - self.top
-        else:
-            return self.board.height
+        return self.board._position_('height', self)
 
 
 class Board(Converter):
     _attrs_ = {'AvailableTags': 'list'}
     _items_ = {'BacklogTopLevelLane': 'Lanes', 'ArchiveTopLevelLane': 'Lanes',
                'TopLevelLanes': 'Lanes'}
+    _indexes_ = {'lane': 'LaneId', 'user': 'AssignedUserIds', 'type': 'TypeId',
+                 'tag': 'Tags', 'class_of_service': 'ClassOfServiceId'}
 
-    def __init__(self, board, timezone=None):
+    def __init__(self, board, timezone=None, compact=False, lazy=False):
+        self.timings = {}  # seconds taken by each phase of the construction
         if isinstance(board, int):
             log.debug('Downloading board {}'.format(board))
+            start = perf_counter()
             board = api.get('/Boards/{}'.format(board))
+            self.timings['Download'] = perf_counter() - start
+        self.compact = compact
+        self._integers_ = {}
         super().__init__(board, self)
+        self.lazy = lazy
+        self._guard_ = Guard()
         self.cards = {}
         self.timezone = tz(timezone) if timezone else None
         self.users = self._populate_('BoardUsers', User)
         self._populate_('CardTypes', CardType)
         self._populate_('ClassesOfService', ClassOfService)
-        self._populate_('Lanes', Lane)
-        self.lanes.update(self._populate_('Backlog', Lane))
-        self.lanes.update(self._populate_('Archive', Lane))
+        if lazy:
+            self._defer_()
+        else:
+            self._populate_('Lanes', Lane)
+            self.lanes.update(self._populate_('Backlog', Lane))
+            self.lanes.update(self._populate_('Archive', Lane))
+            start = perf_counter()
+            self.index_lanes()
+            self.timings['LaneTree'] = perf_counter() - start
+        instruments = getattr(api, 'instruments', None)
+        if instruments is not None:
+            instruments.board(self.timings)
 
     def __str__(self):
         return self['Title']
 
+    def _share_(self, data):
+        """ Yields the items of the data of an element, replacing strings
+        and integers with an equal one already in the board, if any """
+        integers = self._integers_
+        for key, value in data.items():
+            if type(value) is str:
+                value = intern(value)
+            elif type(value) is int:
+                value = integers.setdefault(value, value)
+            yield key, value
+
     def _populate_(self, key, element):
-        items = {}
-        for item in self[key]:
-            instance = element(item, self)
-            items[instance.id] = instance
+        start = perf_counter()
+        if self.lazy:
+            items = Lazy(((item['Id'], item) for item in self[key]),
+                         partial(element, board=self), self._guard_)
+        else:
+            items = {}
+            for item in self[key]:
+                instance = element(item, self)
+                items[instance.id] = instance
         self[key] = items
+        self.timings[key] = perf_counter() - start
         return items
 
+    def _defer_(self):
+        """ Sets up lazy mappings of lanes and cards, where each card is
+        built along with the rest of its lane when any of them is accessed """
+        sections = {key: self[key] for key in ['Lanes', 'Backlog', 'Archive']}
+        data = [lane for lanes in sections.values() for lane in lanes]
+        lanes = Lazy(((lane['Id'], lane) for lane in data),
+                     partial(Lane, board=self), self._guard_)
+        self['Lanes'] = lanes
+        for key in ['Backlog', 'Archive']:
+            self[key] = Lazy(((lane['Id'], lane['Id'])
+                              for lane in sections[key]), lanes.__getitem__,
+                             self._guard_)
+        self.cards = Lazy(((card['Id'], lane['Id']) for lane in data
+                           for card in lane['Cards'] if card['TypeId']),
+                          lanes.__getitem__, self._guard_)
+
     @property
     def top_level_lanes(self):
         return [self.lanes[lane_id] for lane_id in self.top_level_lane_ids]
 
     @property
     def archive_lanes(self):
-        archive_lane = self.archive_top_level_lane
-        return [archive_lane] + archive_lane.descendants
+        return [self.lanes[lane_id] for lane_id
+                in self._subtree_(self['ArchiveTopLevelLaneId'])]
 
     @property
     def backlog_lanes(self):
         if self.backlog_top_level_lane_id not in self.lanes:
             raise KanbanError("Backlog lanes not available")
-        backlog_lane = self.backlog_top_level_lane
-        return [backlog_lane] + backlog_lane.descendants
+        return [self.lanes[lane_id] for lane_id
+                in self._subtree_(self['BacklogTopLevelLaneId'])]
 
     @property
     def sorted_lanes(self):
-        lanes = []
-        lanes += self.backlog_lanes
-        for lane in self.top_level_lanes:
-            lanes += [lane] + lane.descendants
-        lanes += self.archive_lanes
-        return lanes
-
-    def get_archive(self):
-        archive = api.get('/Board/{0.id}/Archive'.format(self))[0]
-        siblings = self.board.lanes[archive['Lane']['Id']]['SiblingLaneIds']
-        archive['Lane']['SiblingLaneIds'] = siblings
-        main_archive_lane = Lane(archive['Lane'], self)
-        self.lanes[main_archive_lane.id] = main_archive_lane
-        for lane_dict in archive['ChildLanes']:
-            lane = Lane(lane_dict['Lane'], self)
+        if self.backlog_top_level_lane_id not in self.lanes:
+            raise KanbanError("Backlog lanes not available")
+        tree = self.tree
+        return [self.lanes[i] for i in tree['order'][:tree['sorted']]]
+
+    def _subtree_(self, lane_id):
+        """ Returns the ids of the lane and its descendants """
+        tree = self.tree
+        start, end = tree['start'].get(lane_id, 0), tree['end'].get(lane_id, 0)
+        return tree['order'][start:end]
+
+    @property
+    def tree(self):
+        tree = self.__dict__.get('tree')
+        if tree is None:
+            with self._guard_:
+                tree = self.__dict__.get('tree') or self.index_lanes()
+        return tree
+
+    def index_lanes(self):
+        """ Indexes the hierarchy of lanes
+
+        Lanes are listed by id in the `order` of sorted_lanes, where the
+        descendants of each lane follow it, between its `start` and `end`
+        positions, followed by any lanes out of the hierarchy. The ids of
+        the `ascendants` and the `path` of each lane are kept as well, all
+        of them stored in the `tree` dictionary. Lazy boards are indexed
+        from the data of the lanes, without building them """
+        lanes = self._peek_()
+        order, start, end, ascendants, path = [], {}, {}, {}, {}
+
+        def visit(root):
+            root_id, parent_id = root['Id'], root['ParentLaneId']
+            if parent_id in start:
+                ascendants[root_id] = (parent_id, *ascendants[parent_id])
+                path[root_id] = path[parent_id] + '::' + root['Title']
+            else:
+                ascendants[root_id], path[root_id] = (), root['Title']
+            stack = [(root, False)]
+            while stack:
+                lane, visited = stack.pop()
+                lane_id = lane['Id']
+                if visited:
+                    end[lane_id] = len(order)
+                    continue
+                elif lane_id in start:
+                    continue
+                start[lane_id] = len(order)
+                order.append(lane_id)
+                stack.append((lane, True))
+                above = (lane_id, *ascendants[lane_id])
+                for child_id in reversed(lane['ChildLaneIds']):
+                    child = lanes(child_id)
+                    if child is not None and child_id not in start:
+                        ascendants[child_id] = above
+                        path[child_id] = path[lane_id] + '::' + child['Title']
+                        stack.append((child, False))
+
+        roots = [self['BacklogTopLevelLaneId'], *self['TopLevelLaneIds'],
+                 self['ArchiveTopLevelLaneId']]
+        for lane_id in roots:
+            if lane_id in self.lanes and lane_id not in start:
+                visit(lanes(lane_id))
+        count = len(order)
+        for lane_id in list(self.lanes):
+            if lane_id not in start:
+                visit(lanes(lane_id))
+        tree = {'order': order, 'start': start, 'end': end,
+                'ascendants': ascendants, 'path': path, 'sorted': count}
+        self.__dict__['tree'] = tree
+        return tree
+
+    def _peek_(self):
+        """ Returns a function giving the lane with an id, or its data if the
+        board is lazy and it hasn't been built yet """
+        return getattr(self.lanes, 'peek', self.lanes.get)
+
+    def get_archive(self, stream=False):
+        """ Downloads the archived lanes and their cards. With `stream`,
+        the lanes are built one by one as the response is received """
+        url = '/Board/{0.id}/Archive'.format(self)
+        if stream:
+            lanes = api.stream(url, 'item.Lane', 'item.ChildLanes.item.Lane')
+        else:
+            archive = api.get(url)[0]
+            lanes = [('item.Lane', archive['Lane'])] + \
+                [('item.ChildLanes.item.Lane', lane_dict['Lane'])
+                 for lane_dict in archive['ChildLanes']]
+        for path, lane_dict in lanes:
+            if path == 'item.Lane':
+                siblings = self.lanes[lane_dict['Id']]['SiblingLaneIds']
+                lane_dict['SiblingLaneIds'] = siblings
+            lane = Lane(lane_dict, self)
             self.lanes[lane.id] = lane
+        self.__dict__.pop('layout', None)
+        self.__dict__.pop('_replay_', None)
+        self._reset_()
+        self.index_lanes()
 
     def get_recent_archive(self):
         archive = api.get('/Board/{0.id}/ArchiveCards'.format(self))
         return [Card(card, self.lanes.get(card['LaneId']), self)
                 for card in archive if card['TypeId']]
 
+    def iter_archive_cards(self):
+        """ Yields the recently archived cards, like get_recent_archive,
+        building each of them as soon as it's received """
+        url = '/Board/{0.id}/ArchiveCards'.format(self)
+        for _, card in api.stream(url, 'item'):
+            if card['TypeId']:
+                yield Card(card, self.lanes.get(card['LaneId']), self)
+
+    def refresh(self):
+        """ Updates the board in place if a newer version exists
+
+        Returns a dictionary with the cards that have been added, removed,
+        moved or updated and the lanes that have changed, or None if the
+        board is already up to date """
+        url = '/Board/{0.id}/BoardVersion/{0.version}/GetNewerIfExists'
+        board = api.get(url.format(self))
+        if not board:
+            return None
+        log.debug('Updating board {} to version {}'.format(
+            self.id, board['Version']))
+        changes = {'added': [], 'removed': [], 'moved': [], 'updated': [],
+                   'lanes': []}
+        replaced = [self._merge_('BoardUsers', board.pop('BoardUsers'), User),
+                    self._merge_('CardTypes', board.pop('CardTypes'),
+                                 CardType),
+                    self._merge_('ClassesOfService',
+                                 board.pop('ClassesOfService'),
+                                 ClassOfService)]
+        archive = self.archive_top_level_lane
+        archived = {lane.id for lane in self.lanes.values()
+                    if lane.top_lane is archive}
+        previous = {card.id: card for lane in self.lanes.values()
+                    if lane.id not in archived for card in lane.cards}
+
+        lanes, renamed = {}, False
+        for section in ['Lanes', 'Backlog', 'Archive']:
+            for lane_dict in board.pop(section):
+                lanes[lane_dict['Id']] = lane_dict
+                lane = self.lanes.get(lane_dict['Id'])
+                if lane is None:
+                    lane = Lane(dict(lane_dict, Cards=[]), self)
+                    self.lanes[lane.id] = self[section][lane.id] = lane
+                    changes['lanes'].append(lane)
+                elif any(lane.get(key) != lane_dict.get(key)
+                         for key in lane._layout_):
+                    changes['lanes'].append(lane)
+                renamed |= lane.get('Title') != lane_dict.get('Title')
+                lane.update(lane_dict)
+        for lane_id in set(self.lanes) - set(lanes) - archived:
+            lane = self.lanes[lane_id]
+            del self.lanes[lane_id]
+            self['Backlog'].pop(lane_id, None)
+            self['Archive'].pop(lane_id, None)
+            changes['lanes'].append(lane)
+
+        seen = {card['Id'] for lane_dict in lanes.values()
+                for card in lane_dict['Cards'] if card['TypeId']}
+        for lane_id, lane_dict in lanes.items():
+            lane = self.lanes[lane_id]
+            cards = []
+            for card_dict in lane_dict['Cards']:
+                if not card_dict['TypeId']:
+                    continue
+                card = self.cards.get(card_dict['Id'])
+                if card is None:
+                    card = Card(card_dict, lane, self)
+                    changes['added'].append(card)
+                    cards.append(card)
+                    continue
+                if card.lane is not lane:
+                    card.lane = lane
+                    changes['moved'].append(card)
+                if card != card_dict:
+                    card.update(card_dict)
+                    card.__dict__.pop('history', None)
+                    card.__dict__.pop('comments', None)
+                    changes['updated'].append(card)
+                cards.append(card)
+            if lane_id in archived:
+                cards += [card for card in lane.cards if card.id not in seen]
+            lane.cards = cards
+            if self.compact:
+                lane['Cards'] = cards
+        for card_id in set(previous) - seen:
+            changes['removed'].append(self.cards.pop(card_id))
+
+        self.update(board)
+        if any(replaced):
+            self._reset_()
+        elif changes['lanes']:
+            for lane in self.lanes.values():
+                lane._invalidate_()
+        if changes['lanes'] or renamed:
+            self.index_lanes()
+        self.__dict__.pop('indexes', None)
+        self.__dict__.pop('_replay_', None)
+        if changes['lanes']:
+            for lane in self.lanes.values():
+                lane.__dict__.pop('left_lanes', None)
+            self.__dict__.pop('layout', None)
+        return changes
+
+    def _reset_(self):
+        """ Drops the converted values of all the elements of the board,
+        which may reference elements that have been replaced """
+        elements = [self]
+        for items in [self.lanes, self.cards]:
+            elements += items.loaded() if isinstance(items, Lazy) \
+                else items.values()
+        for element in elements:
+            element._invalidate_()
+
+    def _merge_(self, key, items, element):
+        """ Replaces the elements that have changed with new ones instead of
+        updating them, since they may be shared with other boards. Returns
+        whether any of them has been added, replaced or removed """
+        current, replaced = self[key], False
+        for item in items:
+            if current.get(item['Id']) != item:
+                current[item['Id']] = element(item, self)
+                replaced = True
+        for item_id in set(current) - {item['Id'] for item in items}:
+            del current[item_id]
+            replaced = True
+        return replaced
+
+    @property
+    def indexes(self):
+        """ Ids of the cards by each of the `_indexes_` dimensions, built on
+        first use and kept up to date as cards are added or replaced """
+        indexes = self.__dict__.get('indexes')
+        if indexes is None:
+            indexes = {name: {} for name in self._indexes_}
+            indexes['cards'] = {}
+            self.__dict__['indexes'] = indexes
+            for card in self.cards.values():
+                self._index_(card)
+        return indexes
+
+    def _index_(self, card):
+        indexes = self.__dict__['indexes']
+        self._unindex_(card.id)
+        entries = indexes['cards'][card.id] = []
+        for name, key in self._indexes_.items():
+            values = card[key] if key in card else None
+            for value in values if isinstance(values, list) else [values]:
+                if value:
+                    indexes[name].setdefault(value, set()).add(card.id)
+                    entries.append((name, value))
+
+    def _unindex_(self, card_id):
+        indexes = self.__dict__['indexes']
+        for name, value in indexes['cards'].pop(card_id, []):
+            card_ids = indexes[name][value]
+            card_ids.discard(card_id)
+            if not card_ids:
+                del indexes[name][value]
+
+    def query(self, lane=None, user=None, type=None, tag=None,
+              class_of_service=None):
+        """ Returns the cards matching all the given criteria, sorted by id
+
+        Each criterion can be a single value or a list of values, any of
+        which will match. Lanes match the cards in any of their descendants,
+        and lanes, users, types and classes of service can be given either
+        as objects or ids """
+        criteria = {'lane': lane, 'user': user, 'type': type, 'tag': tag,
+                    'class_of_service': class_of_service}
+        indexes = self.indexes
+        matches = None
+        for name, values in criteria.items():
+            if values is None:
+                continue
+            values = values if isinstance(values, (list, set, tuple)) \
+                else [values]
+            values = [getattr(value, 'id', value) for value in values]
+            if name == 'lane':
+                values = [sublane for lane_id in values
+                          for sublane in self._subtree_(lane_id)] \
+                    + [lane_id for lane_id in values
+                       if lane_id not in self.tree['start']]
+            card_ids = set().union(*[indexes[name].get(value, ())
+                                     for value in values])
+            matches = card_ids if matches is None else matches & card_ids
+        if matches is None:
+            matches = indexes['cards']
+        return [self.cards[card_id] for card_id in sorted(matches)]
+
+    def parse_dates(self, history=True):
+        """ Converts the dates of all cards, and of the events of their
+        histories if already downloaded, instead of waiting for access """
+        elements = list(self.cards.values())
+        if history:
+            elements += [event for card in self.cards.values()
+                         for event in card.__dict__.get('history', [])]
+        for element in elements:
+            values = element.__dict__.setdefault('_values_', {})
+            for key, kind in element._attrs_.items():
+                if kind in ('date', 'datetime') and key not in values \
+                        and key in element:
+                    values[key] = element._convert_(key)
+
+    def to_columns(self, cards=None):
+        """ Returns the fields of the cards as NumPy arrays, see columns """
+        from .columns import cards as columns
+        return columns(self, cards)
+
+    def events_table(self, cards=None):
+        """ Returns the history of the cards as NumPy arrays, see columns """
+        from .columns import events
+        return events(self, cards)
+
+    def replay(self, cards=None):
+        """ Returns the moves of the cards between lanes sorted by time,
+        downloading the histories that aren't cached yet, see replay. The
+        moves of all the cards are kept for `state_at` """
+        from .replay import Replay
+        replay = Replay.from_cards(self.cards.values() if cards is None
+                                   else cards)
+        if cards is None:
+            self.__dict__['_replay_'] = replay
+        return replay
+
+    def state_at(self, when):
+        """ Returns the lane each card was in at the given time, or None if
+        the lane is unknown, leaving out the cards that didn't exist yet.
+        Naive times are taken to be in the timezone of the board """
+        replay = self.__dict__.get('_replay_')
+        if replay is None:
+            replay = self.replay()
+        if self.timezone and when.tzinfo is None:
+            when = localize(when, self.timezone)
+        return {self.cards[card_id]: self.lanes.get(lane_id) for card_id,
+                lane_id in replay.state_at(when).items()}
+
+    def save_snapshot(self, path):
+        """ Stores the board in a binary file, see snapshot """
+        from .snapshot import save
+        save(self, path)
+
+    @classmethod
+    def load_snapshot(cls, path):
+        """ Restores a board stored with save_snapshot """
+        from .snapshot import load
+        return load(path, cls)
+
+    def prefetch_history(self, cards=None, workers=10):
+        """ Downloads the history of several cards concurrently """
+        return self._prefetch_('history', cards, workers)
+
+    def prefetch_comments(self, cards=None, workers=10):
+        """ Downloads the comments of several cards concurrently """
+        return self._prefetch_('comments', cards, workers)
+
+    def _prefetch_(self, name, cards, workers):
+        cards = self.cards.values() if cards is None else cards
+        pending = [card for card in cards if name not in card.__dict__]
+        log.debug('Prefetching {} of {} cards'.format(name, len(pending)))
+        failure = 'Failed to get ' + name + ' of card {0.id}: {1}'
+        return _concurrently_(attrgetter(name), pending, workers, failure)[1]
+
     def get_card(self, card_id):
+        """ Downloads a card and puts it in place of the previous version """
         url = '/Board/{}/GetCard/{}'
-        card_dict = api.get(url.format(str(self.id), card_id))
-        lane = self.lanes.get(card_dict['LaneId'])  # TODO: replace card in lane
+        return self._place_(api.get(url.format(str(self.id), card_id)))
+
+    def get_cards(self, card_ids, workers=10):
+        """ Downloads several cards concurrently, like get_card, and returns
+        the errors of those that failed by card id """
+        url = '/Board/{}/GetCard/{}'
+        cards, errors = _concurrently_(
+            lambda card_id: api.get(url.format(self.id, card_id)),
+            card_ids, workers, 'Failed to get card {}: {}')
+        for card_dict in cards.values():
+            self._place_(card_dict)
+        return errors
+
+    def _place_(self, card_dict):
+        """ Builds a card and puts it in its lane, replacing the previous
+        version of the card, which is taken out of its lane if it moved """
+        previous = self.cards.get(card_dict['Id'])
+        lane = self.lanes.get(card_dict['LaneId'])
         card = Card(card_dict, lane, self)
+        position = None
+        if previous is not None and previous.lane is not None:
+            cards = previous.lane.cards
+            position = next((index for index, other in enumerate(cards)
+                             if other is previous), None)
+            if position is not None:
+                del cards[position]
+            if previous.lane is not lane:
+                position = None
+        if lane is not None:
+            if position is None:
+                position = card.get('Index')
+            lane.cards.insert(len(lane.cards) if position is None
+                              else position, card)
         return card
 
-    @cached_property
+    @property
     def height(self):
         """ Total height of the board """
-        return max([lane.bottom for lane in self.lanes.values()])
+        return self._position_('height')
+
+    def _position_(self, name, lane=None):
+        layout = self.__dict__.get('layout')
+        if layout is None:
+            with self._guard_:
+                layout = self.__dict__.get('layout') or self.compute_layout()
+        if lane is None:
+            return layout['board'][name]
+        return layout[name][layout['index'][lane.id]]
+
+    def compute_layout(self):
+        """ Computes the position and size of all lanes at once
+
+        Lanes are visited once in the same order they are drawn, sorting
+        each group of siblings only once. The results are stored in arrays
+        within the `layout` dictionary, next to the position of each lane
+        in the arrays, and read by the geometric properties of the lanes """
+        peek = self._peek_()
+        lanes = [peek(lane_id) for lane_id in list(self.lanes)]
+        index = {lane['Id']: i for i, lane in enumerate(lanes)}
+        size = len(lanes)
+        parent, previous = [None] * size, [None] * size
+        children, last = [[]] * size, [False] * size
+
+        def arrange(group, first=None):
+            group = sorted(group, key=lambda i: lanes[i]['Index'])
+            indexes = [lanes[i]['Index'] for i in group]
+            for i in group:
+                position = bisect_left(indexes, lanes[i]['Index'])
+                previous[i] = group[position - 1] if position else first
+                last[i] = position == len(group) - 1
+            return group
+
+        for i, lane in enumerate(lanes):
+            parent[i] = index.get(lane['ParentLaneId'])
+            children[i] = arrange(index[child] for child
+                                  in lane['ChildLaneIds'] if child in index)
+
+        backlog = index.get(self['BacklogTopLevelLaneId'])
+        archive = index.get(self['ArchiveTopLevelLaneId'])
+        top_level = [index[lane] for lane in self['TopLevelLaneIds']
+                     if lane in index]
+        group = arrange(top_level, backlog)
+        indexes = [lanes[i]['Index'] for i in group]
+        others = [i for i in range(size) if parent[i] is None and
+                  i not in group and i not in (backlog, archive)]
+        for i in others:
+            position = bisect_left(indexes, lanes[i]['Index'])
+            previous[i] = group[position - 1] if position else backlog
+        if archive is not None:
+            previous[archive] = top_level[-1] if top_level else backlog
+        if backlog is not None:
+            previous[backlog] = None
+        roots = [backlog] + [i for i in group if i not in (backlog, archive)]
+        roots = [i for i in roots + others + [archive] if i is not None]
+
+        left, right = array('l', [0] * size), array('l', [0] * size)
+        top, bottom = array('l', [0] * size), array('l', [0] * size)
+        order, stack = [], [(i, False) for i in reversed(roots)]
+        while stack:
+            i, visited = stack.pop()
+            lane = lanes[i]
+            if visited:
+                if children[i]:
+                    right[i] = max(right[child] for child in children[i])
+                    bottom[i] = max(bottom[child] for child in children[i])
+                else:
+                    right[i] = left[i] + lane['Width'] * Lane.WIDTH
+                    bottom[i] = top[i] + Lane.HEADER + Lane.BORDER + Lane.BOX
+                continue
+            order.append(i)
+            up, side = parent[i], previous[i]
+            if lane['Orientation'] == 1 and up is not None:
+                left[i] = left[up]
+            elif side is not None:
+                left[i] = right[side] + Lane.BORDER
+            elif up is not None:
+                left[i] = left[up]
+            if lane['Orientation'] == 1 and side is not None:
+                top[i] = bottom[side] + Lane.BORDER
+            elif up is not None:
+                top[i] = top[up] + Lane.HEADER + Lane.BORDER
+            stack.append((i, True))
+            stack.extend((child, False) for child in reversed(children[i]))
+
+        board = {'height': max(bottom) if size else 0,
+                 'width': max(right) if size else 0}
+        height = array('l', [0] * size)
+        for i in order:
+            up = parent[i]
+            if up is None:
+                height[i] = board['height']
+            elif lanes[i]['Orientation'] == 0 or last[i]:
+                height[i] = height[up] - (top[i] - top[up])
+            else:
+                height[i] = bottom[i] - top[i]
+        layout = {'index': index, 'left': left, 'right': right, 'top': top,
+                  'bottom': bottom, 'height': height, 'board': board}
+        self.__dict__['layout'] = layout
+        return layout
+
+
+def _concurrently_(function, items, workers, failure):
+    """ Calls the function with each of the items in a pool of threads and
+    returns its results and the errors it raised, both by item. Errors are
+    logged with the `failure` message, formatted with the item and error """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    results, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(function, item): item for item in items}
+        for future in as_completed(futures):
+            item, error = futures[future], future.exception()
+            if error:
+                log.warning(failure.format(item, error))
+                errors[item] = error
+            else:
+                results[item] = future.result()
+    return results, errors
 
 
 log = getLogger(__name__)
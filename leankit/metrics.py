@@ -0,0 +1,133 @@
+""" Flow metrics computed from card history events. Requires numpy.
+
+The events are given as a dictionary of arrays with at least the `CardId`,
+`Type`, `DateTime` and `ToLaneId` columns, like those returned by
+`Board.events_table`. Only creation and move events are taken into account.
+"""
+import numpy as np
+
+
+TRANSITIONS = ['CardCreationEventDTO', 'CardMoveEventDTO']
+END = np.datetime64('9999-12-31T23:59:59', 's')  # cards still in a lane
+
+
+class Flow(object):
+    """ Time spent by each card in each lane, kept as arrays sorted by card
+    and time, on top of which the metrics are computed without loops over
+    cards or events """
+
+    def __init__(self, events=None):
+        self.card = np.array([], dtype=np.int64)
+        self.time = np.array([], dtype='datetime64[s]')
+        self.lane = np.array([], dtype=np.int64)
+        self.end = np.array([], dtype='datetime64[s]')
+        if events is not None:
+            self.update(events)
+
+    def __len__(self):
+        return len(self.card)
+
+    def update(self, events):
+        """ Adds new events, such as those that happened since the last
+        update, merging them into the sorted arrays """
+        self._merge_(*self._sorted_(events))
+
+    def replace(self, events):
+        """ Adds the whole history of some cards, replacing any previous
+        events of the same cards """
+        card, time, lane = self._sorted_(events)
+        keep = ~np.isin(self.card, card)
+        self.card, self.time = self.card[keep], self.time[keep]
+        self.lane = self.lane[keep]
+        self._merge_(card, time, lane)
+
+    def _merge_(self, card, time, lane):
+        keys = self._keys_(self.card, self.time)
+        positions = np.searchsorted(keys, self._keys_(card, time), 'right')
+        self.card = np.insert(self.card, positions, card)
+        self.time = np.insert(self.time, positions, time)
+        self.lane = np.insert(self.lane, positions, lane)
+        self._end_()
+
+    @staticmethod
+    def _sorted_(events):
+        """ Returns the card, time and lane of the transitions among the
+        events, sorted by card and time """
+        mask = np.isin(events['Type'], TRANSITIONS)
+        card = np.asarray(events['CardId'], dtype=np.int64)[mask]
+        time = np.asarray(events['DateTime'], dtype='datetime64[s]')[mask]
+        lane = np.asarray(events['ToLaneId'], dtype=np.int64)[mask]
+        order = np.lexsort((time, card))
+        return card[order], time[order], lane[order]
+
+    @staticmethod
+    def _keys_(card, time):
+        keys = np.empty(len(card), dtype=[('card', np.int64),
+                                          ('time', np.int64)])
+        keys['card'], keys['time'] = card, time.astype(np.int64)
+        return keys
+
+    def _end_(self):
+        """ Sets the time each card left each lane, which is when it moved
+        next, or END if it's still there """
+        self.end = np.full(len(self.card), END, dtype='datetime64[s]')
+        same = self.card[1:] == self.card[:-1]
+        self.end[:-1][same] = self.time[1:][same]
+
+    @property
+    def lanes(self):
+        return np.unique(self.lane)
+
+    def arrivals(self, lanes):
+        """ Returns the ids of the cards that have reached any of the lanes
+        and the first time each of them did so """
+        mask = np.isin(self.lane, list(lanes))
+        cards, index = np.unique(self.card[mask], return_index=True)
+        return cards, self.time[mask][index]
+
+    def cycle_time(self, start, end):
+        """ Returns the ids of the cards that have gone from any of the
+        `start` lanes to any of the `end` lanes and the time it took them """
+        return self._durations_(self.arrivals(start), self.arrivals(end))
+
+    def lead_time(self, end):
+        """ Like cycle_time, starting when each card was created """
+        cards, index = np.unique(self.card, return_index=True)
+        return self._durations_((cards, self.time[index]), self.arrivals(end))
+
+    @staticmethod
+    def _durations_(start, end):
+        cards, first, second = np.intersect1d(start[0], end[0],
+                                              return_indices=True)
+        durations = end[1][second] - start[1][first]
+        valid = durations >= np.timedelta64(0)
+        return cards[valid], durations[valid]
+
+    def throughput(self, end, bins):
+        """ Returns the number of cards reaching any of the `end` lanes for
+        the first time between each pair of consecutive times in `bins` """
+        times = self.arrivals(end)[1].astype(np.int64)
+        edges = np.asarray(bins, dtype='datetime64[s]').astype(np.int64)
+        return np.histogram(times, edges)[0]
+
+    def wip(self, times, lanes=None):
+        """ Returns the number of cards in each lane at each of the times """
+        times = np.asarray(times, dtype='datetime64[s]')
+        wip = {}
+        for lane in self.lanes if lanes is None else lanes:
+            mask = self.lane == lane
+            starts = np.sort(self.time[mask])
+            ends = np.sort(self.end[mask])
+            wip[lane] = np.searchsorted(starts, times, 'right') - \
+                np.searchsorted(ends, times, 'right')
+        return wip
+
+    def cumulative_flow(self, times, lanes=None):
+        """ Returns the number of cards that have reached each lane, at any
+        point before each of the times, for a cumulative flow diagram """
+        times = np.asarray(times, dtype='datetime64[s]')
+        flow = {}
+        for lane in self.lanes if lanes is None else lanes:
+            arrivals = np.sort(self.arrivals([lane])[1])
+            flow[lane] = np.searchsorted(arrivals, times, 'right')
+        return flow
@@ -0,0 +1,90 @@
+""" Reconstruction of the lanes the cards were in at any point in time
+
+The history of the cards is turned into a single log of moves, sorted by
+time, next to checkpoints of the lane of every card and of the number of
+cards in each lane taken at regular intervals. The state at a given time is
+found by binary search and rebuilt from the closest checkpoint, without
+walking the whole history again. Like in metrics, only creation and move
+events are taken into account.
+"""
+from bisect import bisect_right
+
+TRANSITIONS = ['CardCreationEventDTO', 'CardMoveEventDTO']
+INTERVAL = 256  # moves between checkpoints, at least
+
+
+class Replay(object):
+    """ Moves of the cards, as (time, card id, lane id) tuples, sorted by
+    time. Times can be datetimes or anything else that can be compared, as
+    long as those given to `state_at` and `counts_at` are alike.
+
+    The lanes of the cards are kept every `interval` moves, which by default
+    is at least the number of cards, so that they take about as much memory
+    as the log itself. The counts of each lane are kept every INTERVAL """
+
+    def __init__(self, moves, interval=None):
+        moves = sorted(moves, key=lambda move: move[0])
+        self.times = [move[0] for move in moves]
+        self.cards = [move[1] for move in moves]
+        self.lanes = [move[2] for move in moves]
+        self.previous = []  # lane of the card before each move
+        self.interval = interval or max(INTERVAL, len(set(self.cards)))
+        self._placements_, self._counts_ = [], []
+        placement, counts = {}, {}
+        for index, (card, lane) in enumerate(zip(self.cards, self.lanes)):
+            if index % self.interval == 0:
+                self._placements_.append(dict(placement))
+            if index % INTERVAL == 0:
+                self._counts_.append(dict(counts))
+            previous = placement.get(card)
+            self.previous.append(previous)
+            placement[card] = lane
+            if previous is not None:
+                counts[previous] -= 1
+            counts[lane] = counts.get(lane, 0) + 1
+
+    def __repr__(self):
+        return '<{} of {} moves>'.format(self.__class__.__name__, len(self))
+
+    def __len__(self):
+        return len(self.times)
+
+    @classmethod
+    def from_cards(cls, cards, interval=None):
+        """ Builds the log from the history of the cards, downloading it
+        if it isn't cached yet """
+        return cls(((event.date_time, card.id, event['ToLaneId'])
+                    for card in cards for event in card.history
+                    if event['Type'] in TRANSITIONS), interval)
+
+    def _checkpoint_(self, when, checkpoints, interval):
+        """ Returns the number of moves made until the given time, inclusive,
+        and the index of the closest of the checkpoints before them """
+        end = bisect_right(self.times, when)
+        return end, min(end // interval, len(checkpoints) - 1)
+
+    def state_at(self, when):
+        """ Returns the id of the lane each card was in at the given time,
+        by card id, leaving out the cards that didn't exist yet """
+        end, checkpoint = self._checkpoint_(when, self._placements_,
+                                            self.interval)
+        if checkpoint < 0:
+            return {}
+        placement = dict(self._placements_[checkpoint])
+        for index in range(checkpoint * self.interval, end):
+            placement[self.cards[index]] = self.lanes[index]
+        return placement
+
+    def counts_at(self, when):
+        """ Returns the number of cards in each lane at the given time, by
+        lane id, leaving out the empty lanes """
+        end, checkpoint = self._checkpoint_(when, self._counts_, INTERVAL)
+        if checkpoint < 0:
+            return {}
+        counts = dict(self._counts_[checkpoint])
+        for index in range(checkpoint * INTERVAL, end):
+            previous = self.previous[index]
+            if previous is not None:
+                counts[previous] -= 1
+            counts[self.lanes[index]] = counts.get(self.lanes[index], 0) + 1
+        return {lane: count for lane, count in counts.items() if count}
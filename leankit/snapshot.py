@@ -0,0 +1,95 @@
+""" Binary snapshots of boards, to restore them without downloading them
+
+A snapshot starts with the `MAGIC` bytes and the format `VERSION`, followed
+by the data of the board as received from the API, as JSON compressed with
+zlib: the lanes and cards as they are at the time, including those
+downloaded with `get_archive` or `get_card`, and the cached history and
+comments. Unlike marshal or pickle, the format doesn't depend on the
+version of Python and loading it doesn't run any code.
+
+Snapshots save the download, not the construction: restoring a board
+takes a little longer than building it from the payloads of the API, since
+it's the same data, decompressed first. The events of each history are
+built when it's first accessed, as they are for downloaded histories.
+"""
+import json
+import zlib
+from struct import Struct
+
+from .kanban import Board, Card, Lane, KanbanError
+
+MAGIC = b'LEANKIT\0'
+VERSION = 2  # 1 was serialized with marshal
+HEADER = Struct('>8sH')
+SECTIONS = ['BoardUsers', 'CardTypes', 'ClassesOfService']
+
+
+def save(board, path):
+    """ Writes a snapshot of the board to the given path """
+    with open(path, 'wb') as snapshot:
+        snapshot.write(HEADER.pack(MAGIC, VERSION))
+        data = json.dumps(dump(board), separators=(',', ':'))
+        snapshot.write(zlib.compress(data.encode(), 1))
+
+
+def load(path, cls=Board):
+    """ Returns the board stored at the given path by `save`, as an instance
+    of the given Board class """
+    with open(path, 'rb') as snapshot:
+        magic, version = HEADER.unpack(snapshot.read(HEADER.size))
+        if magic != MAGIC:
+            raise KanbanError('{} is not a board snapshot'.format(path))
+        if version != VERSION:
+            raise KanbanError('Unsupported snapshot version {}'.format(
+                version))
+        return restore(json.loads(zlib.decompress(snapshot.read())), cls)
+
+
+def dump(board):
+    """ Returns the data needed to restore the board, as built-in types """
+    payload = {key: board._raw_(key) for key in board.keys()}
+    for key in SECTIONS:
+        payload[key] = [_raw_(item) for item in board[key].values()]
+    sections = {lane_id: key for key in ['Backlog', 'Archive']
+                for lane_id in board[key]}
+    for key in ['Lanes', 'Backlog', 'Archive']:
+        payload[key] = []
+    placed = set()
+    for lane in board.lanes.values():
+        lane_dict = _raw_(lane)
+        lane_dict['Cards'] = [_raw_(card) for card in lane.cards]
+        placed.update(id(card) for card in lane.cards)
+        payload[sections.get(lane.id, 'Lanes')].append(lane_dict)
+    cards = [card for card in board.cards.values() if id(card) not in placed]
+    return {'board': payload,
+            'timezone': str(board.timezone) if board.timezone else None,
+            'compact': board.compact,
+            'lazy': board.lazy,
+            'cards': [_raw_(card) for card in cards],
+            'history': [[card.id, card._events_()[::-1]]
+                        for card in board.cards.values()
+                        if 'history' in card.__dict__],
+            'comments': [[card.id, card.__dict__['comments']]
+                         for card in board.cards.values()
+                         if 'comments' in card.__dict__]}
+
+
+def restore(data, cls=Board):
+    """ Builds a board from the data returned by `dump` """
+    board = cls(data['board'], data['timezone'], data['compact'],
+                data.get('lazy', False))
+    for card_dict in data['cards']:
+        Card(card_dict, board.lanes.get(card_dict['LaneId']), board)
+    for card_id, events in data['history']:
+        card = board.cards[card_id]
+        card.__dict__['history'] = card._history_(events)
+    for card_id, comments in data['comments']:
+        board.cards[card_id].__dict__['comments'] = comments
+    return board
+
+
+def _raw_(element):
+    item = dict(element.items())
+    if isinstance(element, Lane):
+        item.pop('Cards', None)
+    return item
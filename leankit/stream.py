@@ -0,0 +1,144 @@
+""" Incremental decoding of large JSON documents
+
+Parts of a document are selected by paths of keys separated by dots, where
+`item` stands for each element of an array, e.g. `Lanes.item.Cards.item`
+selects every card of every lane. Only the selected parts are decoded as a
+whole, so the complete document is never held in memory at once.
+"""
+import re
+from json import JSONDecoder, JSONDecodeError
+from json.decoder import scanstring
+
+WHITESPACE = ' \t\n\r'
+NUMBER = re.compile(r'[0-9.eE+-]*')  # characters that may go on a number
+
+
+def items(chunks, *paths):
+    """ Yields the values found at any of the paths as (path, value) pairs,
+    in the order they appear in the document given as chunks of text """
+    reader = Reader(chunks)
+    yield from _walk_(reader, '', set(paths))
+    if reader.peek():
+        raise JSONDecodeError('Extra data', reader.buffer, reader.position)
+
+
+def select(data, *paths):
+    """ Yields the same pairs as `items`, from an already decoded document """
+    def walk(value, path):
+        if path in paths:
+            yield path, value
+        elif _inside_(path, paths):
+            if isinstance(value, dict):
+                for key, child in value.items():
+                    yield from walk(child, _join_(path, key))
+            elif isinstance(value, list):
+                for child in value:
+                    yield from walk(child, _join_(path, 'item'))
+
+    return walk(data, '')
+
+
+class Reader(object):
+    """ Buffer over an iterator of text chunks, dropping what has been read """
+
+    decoder = JSONDecoder()
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = ''
+        self.position = 0
+
+    def _fill_(self, size=1):
+        """ Reads chunks until `size` more characters are available """
+        parts = [self.buffer[self.position:]]
+        missing = size
+        for chunk in self.chunks:
+            parts.append(chunk)
+            missing -= len(chunk)
+            if missing <= 0:
+                break
+        self.buffer, self.position = ''.join(parts), 0
+        return missing < size
+
+    def peek(self):
+        """ Returns the next character other than whitespace, if any """
+        while True:
+            while self.position < len(self.buffer):
+                if self.buffer[self.position] not in WHITESPACE:
+                    return self.buffer[self.position]
+                self.position += 1
+            if not self._fill_():
+                return ''
+
+    def expect(self, character):
+        if self.peek() != character:
+            raise JSONDecodeError('Expecting {!r}'.format(character),
+                                  self.buffer, self.position)
+        self.position += 1
+
+    def key(self):
+        self.expect('"')
+        while True:
+            try:
+                key, end = scanstring(self.buffer, self.position)
+            except JSONDecodeError:
+                if not self._fill_(len(self.buffer) - self.position + 1):
+                    raise
+                continue
+            self.position = end
+            self.expect(':')
+            return key
+
+    def value(self):
+        """ Decodes the next value, reading as much as needed. Incomplete
+        values are retried after doubling the buffer to keep linear time """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer,
+                                                     self.position)
+            except JSONDecodeError:
+                if not self._fill_(len(self.buffer) - self.position):
+                    raise
+                continue
+            # numbers followed only by what may be part of them, up to the
+            # end of the buffer, may go on in the next chunk
+            if type(value) in (int, float) and \
+                    NUMBER.match(self.buffer, end).end() == len(self.buffer) \
+                    and self._fill_(len(self.buffer) - self.position):
+                continue
+            self.position = end
+            return value
+
+
+def _join_(path, key):
+    return '{}.{}'.format(path, key) if path else key
+
+
+def _inside_(path, paths):
+    """ Whether any of the paths goes through the given one """
+    return not path or any(p.startswith(path + '.') for p in paths)
+
+
+def _walk_(reader, path, paths):
+    if path in paths:
+        yield path, reader.value()
+    elif not _inside_(path, paths):
+        reader.value()
+    elif reader.peek() == '{':
+        reader.expect('{')
+        while reader.peek() != '}':
+            key = reader.key()
+            yield from _walk_(reader, _join_(path, key), paths)
+            if reader.peek() == ',':
+                reader.expect(',')
+        reader.expect('}')
+    elif reader.peek() == '[':
+        reader.expect('[')
+        while reader.peek() != ']':
+            yield from _walk_(reader, _join_(path, 'item'), paths)
+            if reader.peek() == ',':
+                reader.expect(',')
+        reader.expect(']')
+    else:
+        reader.value()
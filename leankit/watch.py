@@ -0,0 +1,156 @@
+""" Polling of several boards for newer versions, each one as often as it
+changes
+
+The interval between the polls of a board is shortened each time the board
+has changed and lengthened each time it hasn't, within `minimum` and
+`maximum` seconds. Boards that are due are polled concurrently, under a
+RateLimiter shared by all of them, and the boards that changed are passed
+to the callbacks, put in the queue and yielded when iterating the watch.
+"""
+from time import monotonic
+from logging import getLogger
+from threading import Event, Thread
+from concurrent.futures import ThreadPoolExecutor
+
+from .kanban import Board
+from .connector import RateLimiter
+
+
+class Watch(object):
+    """ Keeps several boards up to date by refreshing them when they are due
+
+    Each of the `callbacks` is called with every board that has changed and
+    the changes returned by `Board.refresh`, and the boards are also put in
+    the `queue`, if given. No more than `rate` polls per second are made on
+    average, with bursts of up to `burst` polls """
+
+    FASTER = 0.5  # factor applied to the interval when the board changed
+    SLOWER = 1.5  # factor applied to the interval when it didn't
+
+    def __init__(self, boards=(), callbacks=(), queue=None, interval=60,
+                 minimum=5, maximum=600, rate=1, burst=5, workers=10):
+        self.boards = {}
+        self.callbacks = list(callbacks)
+        self.queue = queue
+        self.interval = interval
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limiter = RateLimiter(rate, burst)
+        self.workers = workers
+        self.stats = {'polls': 0, 'changes': 0, 'errors': 0, 'wait': 0.0}
+        self._schedule_ = {}  # [time of the next poll, interval] by board
+        self._stopped_ = Event()
+        for board in boards:
+            self.add(board)
+
+    def __repr__(self):
+        return '<{} of {} boards>'.format(self.__class__.__name__,
+                                          len(self.boards))
+
+    def add(self, board):
+        """ Starts watching a board, downloading it if an id is given. The
+        board is polled for the first time right away """
+        if not isinstance(board, Board):
+            board = Board(board)
+        self.boards[board.id] = board
+        self._schedule_[board.id] = [monotonic(), self.interval]
+        return board
+
+    def remove(self, board):
+        board_id = board.id if isinstance(board, Board) else board
+        self._schedule_.pop(board_id, None)
+        return self.boards.pop(board_id, None)
+
+    @property
+    def intervals(self):
+        """ Seconds between the polls of each board, by board id """
+        return {board_id: interval for board_id, (_, interval)
+                in self._schedule_.items()}
+
+    def due(self):
+        """ Returns the seconds until the next poll is due """
+        if not self._schedule_:
+            return self.maximum
+        return max(0, min(due for due, _ in self._schedule_.values()) -
+                   monotonic())
+
+    def poll(self):
+        """ Refreshes the boards that are due, concurrently, and returns
+        those that have changed with their changes, as (board, changes) """
+        now = monotonic()
+        boards = sorted((due, board_id) for board_id, (due, _)
+                        in self._schedule_.items() if due <= now)
+        boards = [self.boards[board_id] for _, board_id in boards]
+        if not boards:
+            return []
+        delays = [self.limiter.reserve() for _ in boards]
+        self.stats['wait'] += max(delays)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(self._refresh_, boards, delays))
+        updates = []
+        for board, changes in zip(boards, results):
+            self.stats['polls'] += 1
+            if isinstance(changes, Exception):
+                log.warning('Failed to poll board {}: {}'.format(
+                    board.id, changes))
+                self.stats['errors'] += 1
+                changes = None
+            schedule = self._schedule_.get(board.id)
+            if schedule is not None:
+                factor = self.FASTER if changes else self.SLOWER
+                schedule[1] = min(self.maximum,
+                                  max(self.minimum, schedule[1] * factor))
+                schedule[0] = monotonic() + schedule[1]
+            if changes:
+                self.stats['changes'] += 1
+                updates.append((board, changes))
+        for board, changes in updates:
+            for callback in self.callbacks:
+                callback(board, changes)
+            if self.queue is not None:
+                self.queue.put(board)
+        return updates
+
+    def _refresh_(self, board, delay):
+        """ Returns the changes of the board after waiting for its turn
+        within the budget, or the error found """
+        if delay > 0 and self._stopped_.wait(delay):
+            return None
+        try:
+            return board.refresh()
+        except Exception as error:
+            return error
+
+    def __iter__(self):
+        """ Polls the boards until stopped, yielding those that changed """
+        while not self._stopped_.wait(self.due()):
+            for board, _ in self.poll():
+                yield board
+
+    async def __aiter__(self):
+        """ Like iterating the watch, polling in a separate thread """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        while not await loop.run_in_executor(None, self._stopped_.wait,
+                                             self.due()):
+            for board, _ in await loop.run_in_executor(None, self.poll):
+                yield board
+
+    def run(self):
+        """ Polls the boards until stopped, passing the changes to the
+        callbacks and the queue """
+        for _ in self:
+            pass
+
+    def start(self):
+        """ Runs the watch in a background thread """
+        self._stopped_.clear()
+        thread = Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stopped_.set()
+
+
+log = getLogger(__name__)
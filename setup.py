@@ -14,6 +14,14 @@ setup(name='leankit',
       author='Guillermo Guirao Aguilar',
       author_email='contact@guillermoguiraoaguilar.com',
       url='https://github.com/Funk66/leankit',
-      install_requires=['cached_property', 'requests', 'pytz'],
+      python_requires='>=3.7',
+      install_requires=['requests', 'pytz; python_version < "3.9"'],
+      extras_require={'columns': ['numpy']},
       setup_requires=['nose', 'rednose', 'coverage', 'leankitmocks'],
-      classifiers=['Programming Language :: Python :: 3.5'])
+      classifiers=['Programming Language :: Python :: 3',
+                   'Programming Language :: Python :: 3 :: Only',
+                   'Programming Language :: Python :: 3.7',
+                   'Programming Language :: Python :: 3.8',
+                   'Programming Language :: Python :: 3.9',
+                   'Programming Language :: Python :: 3.10',
+                   'Programming Language :: Python :: 3.11'])
@@ -0,0 +1,61 @@
+import asyncio
+import unittest
+from time import monotonic
+from unittest.mock import MagicMock, patch
+
+import leankitmocks as leankit
+from leankit import aio
+from leankit.connector import AsyncConnector, RateLimiter
+
+
+class TestAsync(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.object(aio.api, '_get_', new=leankit.kanban.api.get)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_boards(self):
+        boards = asyncio.run(aio.get_boards())
+        self.assertEqual(list, type(boards))
+
+    def test_get_board(self):
+        board = asyncio.run(aio.get_board(100000000, 'Europe/Berlin'))
+        self.assertEqual('Board 100000000', str(board))
+        self.assertEqual('Europe/Berlin', str(board.timezone))
+
+    def test_get_card(self):
+        board = asyncio.run(aio.get_board(100000000))
+        card = asyncio.run(aio.get_card(board, 100010001))
+        self.assertIs(card, board.cards[100010001])
+
+    def test_prefetch_history(self):
+        board = asyncio.run(aio.get_board(100000000))
+        self.assertEqual({}, asyncio.run(aio.prefetch_history(board)))
+        self.assertEqual(7, len(board.cards[100010001].__dict__['history']))
+
+    def test_stream_cached(self):
+        connector = AsyncConnector(size=1)
+        self.addCleanup(connector.executor.shutdown)
+        connector.cache = MagicMock()
+        connector.cache.__contains__.return_value = True
+        connector.cache.get.return_value = {'Lanes': [{'Id': 1}]}
+        self.assertEqual([('Lanes.item', {'Id': 1})],
+                         list(connector.stream('/Boards/1', 'Lanes.item')))
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_burst(self):
+        limiter = RateLimiter(1000, burst=5)
+        self.assertEqual([0] * 5, [limiter.reserve() for _ in range(5)])
+        self.assertGreater(limiter.reserve(), 0)
+
+    def test_wait(self):
+        limiter = RateLimiter(100)
+        start = monotonic()
+        for _ in range(6):
+            limiter.wait()
+        self.assertGreaterEqual(monotonic() - start, 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import logging
+import unittest
+import tempfile
+from unittest.mock import patch
+
+from leankit.cache import Cache
+from leankit.connector import Connector
+
+
+logging.disable(logging.DEBUG)
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.cache = Cache(os.path.join(folder.name, 'cache.db'))
+        self.board = {'Id': 1, 'Version': 3, 'Backlog': [], 'Archive': [],
+                      'Lanes': [{'Cards': [{'Id': 2, 'LastActivity': 'a'}]}]}
+
+    def test_filename(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(folder.name)
+        for filename in ['cache.db', os.path.join('a', 'b', 'cache.db')]:
+            cache = Cache(filename)
+            cache.set('/Boards', [])
+            self.assertEqual([], cache.get('/Boards'))
+            self.assertTrue(os.path.isfile(filename))
+            cache._db_.close()
+
+    def test_uncacheable(self):
+        self.cache.set('/Board/1/GetCard/2', {'Id': 2, 'LastActivity': 'b'})
+        self.assertRaises(KeyError, self.cache.get, '/Board/1/GetCard/2')
+        self.assertEqual(0, self.cache.stats['entries'])
+
+    def test_ttl(self):
+        self.cache.set('/Boards', [])
+        self.assertEqual([], self.cache.get('/Boards'))
+        self.cache.ttl['/Boards'] = 0
+        self.assertRaises(KeyError, self.cache.get, '/Boards')
+        self.assertEqual([], self.cache.get('/Boards', fresh=False))
+        self.assertEqual({'hits': 1, 'misses': 1, 'entries': 1},
+                         {key: value for key, value in self.cache.stats.items()
+                          if key != 'size'})
+
+    def test_card_version(self):
+        url = '/Card/History/1/2'
+        self.cache.set('/Boards/1', self.board)
+        self.cache.set(url, [{'Type': 'CardCreationEventDTO'}])
+        self.cache.ttl['/Card/History/{}/{}'] = 0
+        self.assertEqual(1, len(self.cache.get(url)))
+        self.cache.set('/Board/1/GetCard/2', {'Id': 2, 'LastActivity': 'b'})
+        self.assertRaises(KeyError, self.cache.get, url)
+
+    def test_board_version(self):
+        self.cache.set('/Boards/1', self.board)
+        self.cache.set('/Board/1/ArchiveCards', [])
+        self.assertEqual([], self.cache.get('/Board/1/ArchiveCards'))
+        newer = '/Board/1/BoardVersion/3/GetNewerIfExists'
+        self.cache.set(newer, dict(self.board, Version=4))
+        self.assertRaises(KeyError, self.cache.get, '/Board/1/ArchiveCards')
+        board = self.cache.get('/Boards/1', fresh=False)
+        self.assertEqual(4, board['Version'])
+
+    def test_eviction(self):
+        self.cache.set('/Boards', ['a' * 1000])
+        self.cache.size = self.cache.stats['size'] + 1
+        self.cache.set('/Board/1/ArchiveCards', [])
+        self.assertRaises(KeyError, self.cache.get, '/Boards')
+        self.assertEqual(1, self.cache.stats['entries'])
+
+    def test_connector(self):
+        connector = Connector()
+        connector.cache = self.cache
+        responses = [self.board, None, [], [{'Type': 'CardMoveEventDTO'}]]
+        with patch.object(connector, '_get_', side_effect=responses) as get:
+            self.assertEqual(self.board, connector.get('/Boards/1'))
+            self.assertEqual(self.board, connector.get('/Boards/1'))
+            get.assert_called_with('/Board/1/BoardVersion/3/GetNewerIfExists')
+            self.assertEqual([], connector.get('/Board/1/ArchiveCards'))
+            self.assertEqual([], connector.get('/Board/1/ArchiveCards'))
+            self.assertEqual(1, len(connector.get('/Card/History/1/2')))
+            self.assertEqual(1, len(connector.get('/Card/History/1/2')))
+        self.assertEqual(4, get.call_count)
+        self.assertEqual(2, self.cache.hits)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import leankitmocks as leankit
+
+try:
+    import numpy as np
+    from leankit.columns import categories
+except ImportError:  # pragma: no cover
+    np = None
+
+
+@unittest.skipUnless(np, 'Missing numpy')
+class TestColumns(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.board = leankit.Board(100000000)
+
+    def test_cards(self):
+        columns = self.board.to_columns()
+        self.assertEqual({len(self.board.cards)},
+                         {len(column) for column in columns.values()})
+        self.assertEqual(list(self.board.cards), list(columns['Id']))
+        self.assertEqual(np.datetime64('2017-02-27T17:58:08'),
+                         columns['LastMove'][0])
+        self.assertTrue(np.isnat(columns['DateArchived'][0]))
+
+    def test_codes(self):
+        columns = self.board.to_columns()
+        lanes = categories(self.board)['Lane']
+        self.assertEqual(list(columns['LaneId']),
+                         list(lanes[columns['Lane']]))
+        self.assertEqual([0, -1], list(columns['User']))
+
+    def test_events(self):
+        card = self.board.cards[100010001]
+        columns = self.board.events_table([card])
+        self.assertEqual(len(card.history), len(columns['CardId']))
+        moves = columns['Type'] == 'CardMoveEventDTO'
+        self.assertEqual([100001002, 100001004],
+                         list(columns['ToLaneId'][moves]))
+        self.assertEqual([100001001, 100001002],
+                         list(columns['FromLaneId'][moves]))
+        self.assertTrue(np.all(np.diff(columns['DateTime']) >=
+                               np.timedelta64(0)))
+
+    def test_events_data(self):
+        board = leankit.Board(100000000)
+        card = board.cards[100010001]
+        columns = board.events_table([card])
+        self.assertNotIn('history', card.__dict__)
+        expected = self.board.events_table([self.board.cards[100010001]])
+        for key, column in expected.items():
+            self.assertEqual(list(column), list(columns[key]), key)
+        created = columns['Type'] == 'CardCreationEventDTO'
+        self.assertEqual([-1], list(columns['FromLaneId'][created]))
+        self.assertEqual([-1], list(columns['FromLane'][created]))
+
+
+if __name__ == "__main__":
+    unittest.main()
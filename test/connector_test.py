@@ -1,11 +1,18 @@
 import os
 import json
+import time
 import yaml
 import logging
+import requests
 import unittest
 import datetime
+import threading
+from unittest.mock import Mock, MagicMock, patch
+from concurrent.futures import ThreadPoolExecutor
 
 import leankit
+from leankit.connector import Connector, ThreadSession
+from benchmarks.stub import StubServer, board
 
 
 logging.disable(logging.DEBUG)
@@ -98,12 +105,277 @@ class TestAPI(unittest.TestCase):
                 self.assertGreaterEqual(previous_date, current_date, "History events for card {} are not sorted chronologically".format(card_id))
 
 
+class TestRetry(unittest.TestCase):
+    def setUp(self):
+        self.connector = Connector(retries=2, backoff=0)
+        self.connector.base = 'https://example.leankit.com/kanban/api'
+        patcher = patch('leankit.connector.sleep')
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def response(self, status_code=200, headers=None):
+        reply = {'ReplyCode': 200, 'ReplyText': 'OK', 'ReplyData': [[]]}
+        response = MagicMock(status_code=status_code, ok=status_code < 400,
+                             headers=headers or {},
+                             content=json.dumps(reply).encode(),
+                             json=Mock(return_value=reply))
+        response.__bool__.return_value = response.ok  # as requests does
+        return response
+
+    def test_retry(self):
+        responses = [self.response(503), ConnectionError(), self.response()]
+        with patch.object(self.connector, 'session') as session:
+            session.get.side_effect = responses
+            self.assertEqual([], self.connector.get('/Boards'))
+        self.assertEqual(2, self.connector.stats['retries'])
+        stats = self.connector.instruments.as_dict()['endpoints']['/Boards']
+        self.assertEqual((3, 2, 2), (stats['requests'], stats['retries'],
+                                     stats['errors']))
+
+    def test_retry_after(self):
+        responses = [self.response(429, {'Retry-After': '3'}), self.response()]
+        with patch.object(self.connector, 'session') as session:
+            session.get.side_effect = responses
+            self.connector.get('/Boards')
+        self.sleep.assert_called_once_with(3)
+        self.assertEqual({'retries': 1, 'throttled': 1, 'wait': 3},
+                         self.connector.stats)
+
+    def test_retry_after_invalid(self):
+        self.connector.backoff = 1
+        responses = [self.response(503, {'Retry-After': 'Someday'}),
+                     self.response(503, {'Retry-After': '86400'}),
+                     self.response()]
+        with patch.object(self.connector, 'session') as session:
+            session.get.side_effect = responses
+            self.connector.get('/Boards')
+        first, second = [call[0][0] for call in self.sleep.call_args_list]
+        self.assertLessEqual(first, 1)
+        self.assertEqual(self.connector.WAIT, second)
+
+    def test_retry_closed(self):
+        responses = [self.response(503), self.response()]
+        with patch.object(self.connector, 'session') as session:
+            session.get.side_effect = responses
+            self.connector._get_('/Boards', stream=True)
+        responses[0].close.assert_called_once_with()
+        responses[1].close.assert_not_called()
+
+    def test_give_up(self):
+        with patch.object(self.connector, 'session') as session:
+            session.get.return_value = self.response(502)
+            with self.assertRaises(ConnectionError) as error:
+                self.connector.get('/Boards')
+        self.assertEqual('Server responded with code 502',
+                         str(error.exception))
+        self.assertEqual(3, session.get.call_count)
+
+    def test_no_retry(self):
+        with patch.object(self.connector, 'session') as session:
+            session.get.return_value = self.response(401)
+            self.assertRaises(ConnectionError, self.connector.get, '/Boards')
+        self.assertEqual(1, session.get.call_count)
+
+
+class TestStream(unittest.TestCase):
+    def setUp(self):
+        self.connector = Connector(retries=0)
+        self.connector.base = 'https://example.leankit.com/kanban/api'
+        self.connector.CHUNK = 10
+
+    def response(self, reply):
+        body = json.dumps(reply).encode()
+        chunks = [body[i:i + 10] for i in range(0, len(body), 10)]
+        return Mock(status_code=200, ok=True, headers={},
+                    iter_content=Mock(return_value=iter(chunks)))
+
+    def test_stream(self):
+        cards = [{'Id': i, 'Title': 'Cárd {}'.format(i)} for i in range(5)]
+        reply = {'ReplyCode': 200, 'ReplyText': 'OK', 'ReplyData': [cards]}
+        with patch.object(self.connector, 'session') as session:
+            session.get.return_value = self.response(reply)
+            stream = self.connector.stream('/Board/1/ArchiveCards', 'item')
+            self.assertEqual(cards, [card for _, card in stream])
+        session.get.return_value.close.assert_called_once_with()
+        self.assertTrue(session.get.call_args[1]['stream'])
+
+    def test_stream_error(self):
+        reply = {'ReplyCode': 100, 'ReplyText': 'Not Found', 'ReplyData': []}
+        with patch.object(self.connector, 'session') as session:
+            session.get.return_value = self.response(reply)
+            with self.assertRaises(ConnectionError) as error:
+                list(self.connector.stream('/Board/1/ArchiveCards', 'item'))
+        self.assertEqual('Error 100: Not Found', str(error.exception))
+
+
+class TestCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.connector = Connector()
+        self.started, self.release = threading.Event(), threading.Event()
+
+    def fetch(self, url):
+        self.started.set()
+        self.release.wait(5)
+        if url == '/invalid':
+            raise IOError('Invalid response')
+        return {'Id': 1, 'Lanes': []}
+
+    def concurrent(self, url, count=5):
+        results = []
+
+        def get():
+            try:
+                results.append(self.connector.get(url))
+            except IOError as error:
+                results.append(error)
+
+        threads = [threading.Thread(target=get) for _ in range(count)]
+        threads[0].start()
+        self.started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        while self.connector._flights_[url].shared < count - 1:
+            time.sleep(0.001)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        return results
+
+    def test_single_flight(self):
+        with patch.object(self.connector, '_fetch_',
+                          side_effect=self.fetch) as fetch:
+            results = self.concurrent('/Boards/1')
+        self.assertEqual(1, fetch.call_count)
+        self.assertEqual([{'Id': 1, 'Lanes': []}] * 5, results)
+        self.assertEqual(5, len({id(result['Lanes']) for result in results}))
+        self.assertEqual({}, self.connector._flights_)
+        stats = self.connector.instruments.as_dict()['endpoints']['/Boards/{}']
+        self.assertEqual(4, stats['shared'])
+
+    def test_single_flight_error(self):
+        with patch.object(self.connector, '_fetch_',
+                          side_effect=self.fetch) as fetch:
+            results = self.concurrent('/invalid', 3)
+        self.assertEqual(1, fetch.call_count)
+        errors = [result for result in results if isinstance(result, IOError)]
+        self.assertEqual(3, len(errors))
+
+    def test_ttl(self):
+        self.connector.ttl = 10
+        self.release.set()
+        with patch.object(self.connector, '_fetch_',
+                          side_effect=self.fetch) as fetch:
+            first = self.connector.get('/Boards/1')
+            first['Lanes'].append(1)
+            self.assertEqual([], self.connector.get('/Boards/1')['Lanes'])
+            self.assertEqual(1, fetch.call_count)
+            self.connector._flights_['/Boards/1'].expires = 0
+            self.connector.get('/Boards/1')
+            self.assertEqual(2, fetch.call_count)
+
+
+class TestSession(unittest.TestCase):
+    def setUp(self):
+        self.routes = {'/Boards/{}'.format(i): board(i, cards=5)
+                       for i in range(1, 9)}
+        self.server = StubServer(self.routes, latency=0.01)
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__)
+        self.connector = Connector(retries=0)
+        self.connector.base = self.server.base
+        self.connector.session = ThreadSession(size=4)
+        self.addCleanup(self.connector.session.close)
+
+    def test_threads(self):
+        self.connector.session.auth = ('username', 'password')
+        sessions, lock = {}, threading.Lock()
+
+        def get(board_id):
+            session = self.connector.session.current
+            with lock:
+                sessions[threading.get_ident()] = session
+            return self.connector.get('/Boards/{}'.format(board_id))
+
+        ids = [i for i in range(1, 9) for _ in range(4)]
+        with ThreadPoolExecutor(8) as executor:
+            replies = list(executor.map(get, ids))
+        self.assertEqual([self.routes['/Boards/{}'.format(i)] for i in ids],
+                         replies)
+        self.assertEqual(len(sessions), len(set(map(id, sessions.values()))))
+        for session in sessions.values():
+            self.assertIs(self.connector.session.adapter,
+                          session.get_adapter(self.server.base))
+            self.assertEqual(('username', 'password'), session.auth)
+
+
+class TestConditional(unittest.TestCase):
+    def setUp(self):
+        self.routes = {'/Boards/1': board(cards=20)}
+        self.server = StubServer(self.routes, conditional=True, compress=True)
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__)
+        self.connector = Connector(retries=0)
+        self.connector.base = self.server.base
+        self.connector.session = requests.Session()
+        self.addCleanup(self.connector.session.close)
+
+    def stats(self):
+        return self.connector.instruments.as_dict()['endpoints']['/Boards/{}']
+
+    def test_not_modified(self):
+        first = self.connector.get('/Boards/1')
+        first['Lanes'].clear()
+        second = self.connector.get('/Boards/1')
+        self.assertEqual(self.routes['/Boards/1'], second)
+        self.assertEqual((2, 1), (self.stats()['requests'],
+                                  self.stats()['not_modified']))
+        self.routes['/Boards/1'] = dict(self.routes['/Boards/1'], Version=2)
+        self.assertEqual(2, self.connector.get('/Boards/1')['Version'])
+        self.assertEqual(1, self.stats()['not_modified'])
+
+    def test_unconditional(self):
+        self.connector.conditional = False
+        self.connector.get('/Boards/1')
+        self.connector.get('/Boards/1')
+        self.assertEqual(0, self.stats()['not_modified'])
+        self.assertEqual({}, self.connector._validators_)
+
+    def test_bounded(self):
+        self.routes['/Boards/2'] = board(cards=20)
+        self.connector.get('/Boards/1')
+        size = self.connector._validated_
+        self.connector.VALIDATORS = size * 3 // 2
+        self.connector.get('/Boards/2')
+        self.assertEqual(['/Boards/2'], list(self.connector._validators_))
+        self.assertLessEqual(self.connector._validated_,
+                             self.connector.VALIDATORS)
+        self.connector.VALIDATORS = size // 2
+        self.connector.get('/Boards/1')
+        self.assertEqual(['/Boards/2'], list(self.connector._validators_))
+
+    def test_not_modified_unknown(self):
+        reply = {'ReplyCode': 200, 'ReplyText': 'OK', 'ReplyData': [[]]}
+        responses = [Mock(status_code=304, headers={}),
+                     Mock(status_code=200, ok=True, headers={}, content=b'',
+                          json=Mock(return_value=reply))]
+        with patch.object(self.connector, 'session') as session:
+            session.get.side_effect = responses
+            self.assertEqual([], self.connector.get('/Boards/1'))
+        headers = session.get.call_args[1]['headers']
+        self.assertEqual('no-cache', headers['Cache-Control'])
+
+    def test_compressed(self):
+        self.connector.get('/Boards/1')
+        stats = self.stats()
+        self.assertEqual(self.server.transferred, stats['transferred'])
+        self.assertLess(stats['transferred'] * 5, stats['bytes'])
+
+
 def load_file(url):
     filename = url[1:].replace('/', '-').lower()
     with open('test/responses/{}.json'.format(filename)) as response:
         return json.load(response)
 
 
-
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from datetime import datetime
+
+from leankit.dates import DATE, DATETIME, EVENT, localize, parse_date, \
+    parse_datetime, timezone as zone
+
+try:
+    from pytz import timezone
+except ImportError:  # only installed before Python 3.9
+    timezone = None
+
+# times around the DST changes in Berlin, as localized by pytz
+LOCALIZED = {'03/26/2017 02:30:00 AM': '2017-03-26 02:30:00+01:00',
+             '10/29/2017 02:30:00 AM': '2017-10-29 02:30:00+01:00',
+             '03/26/2017 01:59:59 AM': '2017-03-26 01:59:59+01:00',
+             '10/29/2017 03:00:00 AM': '2017-10-29 03:00:00+01:00'}
+
+
+class TestDates(unittest.TestCase):
+    def test_date(self):
+        for value in ['03/15/2017', '3/5/2017', '12/31/1999']:
+            expected = datetime.strptime(value, DATE).date()
+            self.assertEqual(expected, parse_date(value))
+
+    def test_datetime(self):
+        values = ['03/15/2017 12:45:00 PM', '03/15/2017 12:05:09 AM',
+                  '3/1/2017 1:02:03 AM', '11/30/2017 11:59:59 PM',
+                  '03/15/2017 12:45:00 pm']
+        for value in values:
+            expected = datetime.strptime(value, DATETIME)
+            self.assertEqual(expected, parse_datetime(value))
+
+    def test_event(self):
+        value = '03/10/2017 at 11:21:01 AM'
+        expected = datetime.strptime(value, EVENT)
+        self.assertEqual(expected, parse_datetime(value, None, EVENT))
+
+    def test_timezone(self):
+        value = '03/26/2017 02:30:00 PM'
+        actual = parse_datetime(value, zone('Europe/Berlin'))
+        self.assertEqual('2017-03-26 14:30:00+02:00', str(actual))
+
+    @unittest.skipUnless(timezone, 'pytz is not installed')
+    def test_localize(self):
+        berlin = timezone('Europe/Berlin')
+        for value in LOCALIZED:
+            expected = berlin.localize(datetime.strptime(value, DATETIME))
+            actual = localize(datetime.strptime(value, DATETIME), berlin)
+            self.assertEqual(expected.tzinfo, actual.tzinfo)
+            self.assertEqual(expected, actual)
+            self.assertEqual(LOCALIZED[value], str(actual))
+
+    def test_localize_zoneinfo(self):
+        for value, expected in LOCALIZED.items():
+            actual = localize(datetime.strptime(value, DATETIME),
+                              zone('Europe/Berlin'))
+            self.assertEqual(expected, str(actual))
+
+    def test_invalid(self):
+        for value in ['13/15/2017 12:45:00 PM', '03/15/2017 00:45:00 PM',
+                      '03/15/2017 12:60:00 PM', '03/15/2017']:
+            self.assertRaises(ValueError, parse_datetime, value)
+        self.assertRaises(ValueError, parse_date, '02/30/2017')
+
+
+if __name__ == "__main__":
+    unittest.main()
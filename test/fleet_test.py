@@ -0,0 +1,71 @@
+import copy
+import unittest
+from unittest.mock import patch
+
+import leankitmocks as leankit
+from leankit.fleet import Fleet
+
+
+class TestFleet(unittest.TestCase):
+    def test_load_boards(self):
+        fleet = leankit.load_boards([100000000, 200000000, 1], workers=3)
+        self.assertEqual({100000000, 200000000}, set(fleet.boards))
+        card = fleet.find_card(200010001)
+        self.assertIs(fleet.boards[200000000], card.board)
+        self.assertIsNone(fleet.find_card(1))
+        stats = fleet.stats
+        self.assertEqual(2, stats['loaded'])
+        self.assertEqual(1, stats['failed'])
+        self.assertEqual(4, stats['cards'])
+
+    def test_shared(self):
+        data = leankit.kanban.api.get('/Boards/100000000')
+        other = dict(copy.deepcopy(data), Id=1)
+        other['BoardUsers'][0]['FullName'] = 'Someone else'
+        boards = [leankit.Board(data), leankit.Board(other)]
+        card = boards[1].cards[100010001]
+        fleet = Fleet(boards)
+        self.assertIs(boards[0].card_types[100000015], card.type)
+        self.assertIsNot(boards[0].users[100000001],
+                         boards[1].users[100000001])
+        self.assertIs(boards[1].users[100000001], card.assigned_user)
+        self.assertEqual(len(data['CardTypes']) +
+                         len(data['ClassesOfService']),
+                         fleet.stats['shared'])
+
+    def test_refresh_shared(self):
+        data = leankit.kanban.api.get('/Boards/100000000')
+        boards = [leankit.Board(copy.deepcopy(data)),
+                  leankit.Board(dict(copy.deepcopy(data), Id=1))]
+        Fleet(boards)
+        user = boards[1].users[100000001]
+        self.assertIs(boards[0].users[100000001], user)
+        newer = dict(copy.deepcopy(data), Version=data['Version'] + 1)
+        role = newer['BoardUsers'][0]['Role'] = 1
+        newer['CardTypes'][0]['Name'] = 'Renamed'
+        with patch.object(leankit.kanban.api, 'get', return_value=newer):
+            boards[0].refresh()
+        self.assertEqual(role, boards[0].users[100000001]['Role'])
+        self.assertIsNot(user, boards[0].users[100000001])
+        self.assertIs(user, boards[1].users[100000001])
+        self.assertEqual(data['BoardUsers'][0], dict(user))
+        card_type = data['CardTypes'][0]
+        self.assertEqual(card_type['Name'],
+                         boards[1].card_types[card_type['Id']]['Name'])
+        self.assertEqual('Renamed',
+                         boards[0].card_types[card_type['Id']]['Name'])
+
+    def test_refresh(self):
+        self.addCleanup(leankit.kanban.api._versions_.clear)
+        fleet = Fleet([leankit.Board(100000000)])
+        changes = fleet.refresh()
+        board = fleet.boards[100000000]
+        self.assertEqual([board], list(changes))
+        self.assertEqual(20, board.version)
+        self.assertEqual({}, fleet.refresh())
+        with patch.object(board, 'refresh', side_effect=ConnectionError):
+            self.assertIsInstance(fleet.refresh()[board], ConnectionError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import sys
+import unittest
+import subprocess
+
+
+class TestImport(unittest.TestCase):
+    def run_python(self, code):
+        return subprocess.run([sys.executable, '-c', code],
+                              stdout=subprocess.PIPE, check=True,
+                              universal_newlines=True).stdout.split()
+
+    def test_lazy_import(self):
+        modules = self.run_python(
+            'import sys, leankit\n'
+            'print(*sorted(sys.modules))\n'
+            'print(*vars(leankit.config))')
+        for module in ['requests', 'asyncio', 'pytz', 'leankit.kanban']:
+            self.assertNotIn(module, modules)
+        self.assertNotIn('credentials', modules)
+
+    def test_lazy_attributes(self):
+        output = self.run_python(
+            'import leankit\n'
+            'print(leankit.Board.__module__, leankit.load_boards.__module__)')
+        self.assertEqual(['leankit.kanban', 'leankit.fleet'], output)
+
+
+if __name__ == "__main__":
+    unittest.main()
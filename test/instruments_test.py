@@ -0,0 +1,50 @@
+import unittest
+
+from leankit.instruments import Instruments, endpoint
+
+
+class TestInstruments(unittest.TestCase):
+    def setUp(self):
+        self.records = []
+        self.instruments = Instruments(hooks=[self.records.append])
+
+    def test_endpoint(self):
+        self.assertEqual('/Card/History/{}/{}',
+                         endpoint('/Card/History/123/456'))
+
+    def test_request(self):
+        self.instruments.request('/Boards/1', 0.02, 200, 100, 0.001)
+        self.instruments.request('/Boards/2', 3, 503, error=True, retry=True)
+        self.instruments.cache('/Boards/1', hit=True)
+        stats = self.instruments.as_dict()['endpoints']['/Boards/{}']
+        self.assertEqual(2, stats['requests'])
+        self.assertEqual((1, 1, 1), (stats['errors'], stats['retries'],
+                                     stats['cache_hits']))
+        self.assertEqual(100, stats['bytes'])
+        self.assertEqual((0.025, 1), stats['histogram'][2])
+        self.assertEqual((5, 2), stats['histogram'][9])
+        self.assertEqual(['request', 'request', 'cache'],
+                         [record['kind'] for record in self.records])
+
+    def test_board(self):
+        self.instruments.board({'Lanes': 0.5, 'Download': 1})
+        self.instruments.board({'Lanes': 0.25})
+        data = self.instruments.as_dict()
+        self.assertEqual(2, data['boards'])
+        self.assertEqual({'Lanes': 0.75, 'Download': 1}, data['phases'])
+
+    def test_prometheus(self):
+        self.instruments.request('/Boards/1', 0.02, 200, 100)
+        self.instruments.board({'Lanes': 0.5})
+        lines = self.instruments.prometheus().splitlines()
+        self.assertIn('# TYPE leankit_request_seconds histogram', lines)
+        self.assertIn('leankit_request_seconds_bucket{endpoint="/Boards/{}",'
+                      'le="+Inf"} 1', lines)
+        self.assertIn('leankit_response_bytes_total{endpoint="/Boards/{}"} '
+                      '100', lines)
+        self.assertIn('leankit_board_phase_seconds_total{phase="Lanes"} 0.5',
+                      lines)
+
+
+if __name__ == "__main__":
+    unittest.main()
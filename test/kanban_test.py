@@ -1,7 +1,13 @@
+import copy
+import json
+import pickle
 import unittest
 import datetime
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
 import leankitmocks as leankit
+from leankit.stream import select
 
 
 class TestKanban(unittest.TestCase):
@@ -28,13 +34,173 @@ class TestKanban(unittest.TestCase):
         self.assertEqual(self.board.lanes[100001001],
                          self.board.backlog_top_level_lane)
 
+    def test_board_timings(self):
+        board = leankit.Board(100000000)
+        self.assertIn('Download', board.timings)
+        self.assertIn('BoardUsers', board.timings)
+
+    def test_board_state_at(self):
+        card = self.board.cards[100010001]
+        lanes = self.board.lanes
+        for when, lane in [('2017-02-24 12:59', None),
+                           ('2017-02-24 13:00', lanes[100001001]),
+                           ('2017-02-27 17:58', lanes[100001002]),
+                           ('2017-03-01 00:00', lanes[100001004])]:
+            when = datetime.datetime.strptime(when, '%Y-%m-%d %H:%M')
+            self.assertEqual(lane, self.board.state_at(when).get(card))
+        counts = self.board.replay().counts_at(
+            datetime.datetime(2017, 2, 28, tzinfo=datetime.timezone.utc))
+        self.assertEqual({100001001: 1, 100001004: 1, 100001006: 1}, counts)
+
+    def test_board_state_at_empty(self):
+        from leankit.replay import Replay
+        board = leankit.Board(100000000)
+        when = datetime.datetime(2017, 2, 28)
+        with patch.object(Replay, 'from_cards',
+                          return_value=Replay([])) as from_cards:
+            self.assertEqual({}, board.state_at(when))
+            self.assertEqual({}, board.state_at(when))
+        from_cards.assert_called_once()
+
     def test_board_archive_lanes(self):
         self.assertEqual(3, len(self.board.archive_lanes))
 
+    def test_board_get_archive_stream(self):
+        board = leankit.Board(100000000)
+        api = leankit.kanban.api
+
+        def stream(url, *paths):
+            return select(api.get(url), *paths)
+
+        with patch.object(api, 'stream', side_effect=stream, create=True):
+            board.get_archive(stream=True)
+        self.assertEqual([lane.id for lane in self.board.archive_lanes],
+                         [lane.id for lane in board.archive_lanes])
+        self.assertEqual(self.board.archive_top_level_lane.sibling_lane_ids,
+                         board.archive_top_level_lane.sibling_lane_ids)
+        self.assertIn(100010003, board.cards)
+
+    def test_board_copy(self):
+        card = self.board.cards[100010001]
+        for copied in [copy.copy(card), copy.deepcopy(card),
+                       pickle.loads(pickle.dumps(card))]:
+            self.assertIsNot(card, copied)
+            self.assertEqual(card, copied)
+            self.assertEqual(card.title, copied.title)
+            self.assertEqual(str(card.lane), str(copied.lane))
+        board = pickle.loads(pickle.dumps(self.board))
+        self.assertEqual(set(self.board.lanes), set(board.lanes))
+        self.assertEqual(set(self.board.cards), set(board.cards))
+        self.assertIs(board, board.cards[card.id].board)
+
     def test_board_get_card(self):
         self.assertEqual(self.board.cards[100010001]['Id'],
                          self.board.get_card(100010001)['Id'])
 
+    def test_board_get_card_replaces(self):
+        board = leankit.Board(100000000)
+        previous = board.cards[100010001]
+        card = board.get_card(previous.id)
+        self.assertIsNot(previous, card)
+        self.assertIs(card, board.cards[card.id])
+        self.assertEqual([card], [c for c in previous.lane.cards
+                                  if c.id == card.id])
+        self.assertEqual([card], board.query(lane=card.lane))
+
+    def test_board_get_cards(self):
+        board = leankit.Board(100000000)
+        previous = board.cards[100010001]
+        lane = board.lanes[100001002]
+        get = leankit.kanban.api.get
+
+        def move(url):
+            if url.endswith('123456789'):
+                raise ConnectionError('Server responded with code 404')
+            return dict(get(url), LaneId=lane.id, Index=0)
+
+        with patch.object(leankit.kanban.api, 'get', side_effect=move):
+            errors = board.get_cards([previous.id, 123456789], workers=2)
+        self.assertEqual([123456789], list(errors))
+        card = board.cards[previous.id]
+        self.assertIs(lane, card.lane)
+        self.assertIs(card, lane.cards[0])
+        self.assertNotIn(card.id, [c.id for c in previous.lane.cards])
+        self.assertEqual([card], board.query(lane=lane))
+
+    def test_board_prefetch_history(self):
+        board = leankit.Board(100000000)
+        self.assertEqual({}, board.prefetch_history(workers=2))
+        for card in board.cards.values():
+            self.assertIn('history', card.__dict__)
+        self.assertEqual(7, len(board.cards[100010001].history))
+
+    def test_board_prefetch_failure(self):
+        board = leankit.Board(100000000)
+        card = board.cards[100010001]
+        get = leankit.kanban.api.get
+
+        def fail(url):
+            if url.endswith(str(card.id)):
+                raise ConnectionError('Server responded with code 503')
+            return get(url)
+
+        with patch.object(leankit.kanban.api, 'get', side_effect=fail):
+            errors = board.prefetch_history()
+        self.assertEqual([card], list(errors))
+        self.assertIsInstance(errors[card], ConnectionError)
+        self.assertNotIn('history', card.__dict__)
+        self.assertEqual(len(board.cards) - 1, len(
+            [c for c in board.cards.values() if 'history' in c.__dict__]))
+
+    def test_board_refresh(self):
+        self.addCleanup(leankit.kanban.api._versions_.clear)
+        board = leankit.Board(100000000)
+        lane = board.lanes[100001002]
+        card = board.cards[100010002]
+        card.__dict__['history'] = []
+        left = board.lanes[100001003].left
+        changes = board.refresh()
+        self.assertEqual(20, board.version)
+        self.assertEqual([100010004], [c.id for c in changes['added']])
+        self.assertEqual([100010001], [c.id for c in changes['removed']])
+        self.assertEqual([card], changes['moved'])
+        self.assertEqual([card], changes['updated'])
+        self.assertIn(lane, changes['lanes'])
+        self.assertIn(board.lanes[100001011], changes['lanes'])
+        self.assertIs(card, board.cards[100010002])
+        self.assertIs(board.lanes[100001006], card.lane)
+        self.assertIn(card, board.lanes[100001006].cards)
+        self.assertNotIn(card, board.lanes[100001001].cards)
+        self.assertNotIn(100010001, board.cards)
+        self.assertNotIn('history', card.__dict__)
+        self.assertEqual(2, lane.width // lane.WIDTH)
+        self.assertEqual(left + lane.WIDTH, board.lanes[100001003].left)
+        self.assertIsNone(board.refresh())
+
+    def test_board_refresh_invalidation(self):
+        payload = leankit.kanban.api.get('/Boards/100000000')
+        board = leankit.Board(copy.deepcopy(payload))
+        card, other = board.cards[100010001], board.cards[100010002]
+        card.last_move, other.last_move, other.lane.path
+        tree = board.tree
+        newer = copy.deepcopy(dict(payload, Version=payload['Version'] + 1))
+        for lane_dict in newer['Lanes'] + newer['Backlog']:
+            for card_dict in lane_dict['Cards']:
+                if card_dict['Id'] == card.id:
+                    card_dict['Title'] = 'Renamed'
+        with patch.object(leankit.kanban.api, 'get', return_value=newer):
+            changes = board.refresh()
+        self.assertEqual([card], changes['updated'])
+        self.assertEqual('Renamed', card.title)
+        self.assertNotIn('LastMove', card.__dict__.get('_values_', {}))
+        self.assertIn('LastMove', other.__dict__['_values_'])
+        self.assertIs(tree, board.tree)
+        newer = copy.deepcopy(dict(payload, Version=payload['Version'] + 2))
+        newer['BoardUsers'][0]['FullName'] = 'Renamed'
+        with patch.object(leankit.kanban.api, 'get', return_value=newer):
+            board.refresh()
+        self.assertNotIn('_values_', other.__dict__)
+
     def test_lane_str(self):
         lane = self.board.lanes[100001006]
         self.assertEqual(lane.path, str(lane))
@@ -77,6 +243,40 @@ class TestKanban(unittest.TestCase):
         self.assertEqual(4, len(self.board.lanes[100001003].descendants))
         self.assertEqual([], self.board.lanes[100001006].descendants)
 
+    def test_lane_descends_from(self):
+        lane = self.board.lanes[100001006]
+        self.assertTrue(lane.descends_from(self.board.lanes[100001003]))
+        self.assertFalse(lane.descends_from(lane))
+        self.assertFalse(self.board.lanes[100001003].descends_from(lane))
+        self.assertEqual(2, lane.depth)
+
+    def test_board_query(self):
+        board = self.board
+        card = board.cards[100010001]
+        self.assertEqual([card], board.query(lane=100001003))
+        self.assertEqual([card], board.query(user=board.users[100000001],
+                                             tag=['Tag1', 'Tag3']))
+        self.assertEqual([board.cards[100010003]],
+                         board.query(lane=board.archive_top_level_lane))
+        self.assertEqual([], board.query(lane=100001002, type=100000015))
+        self.assertEqual(len(board.cards), len(board.query()))
+
+    def test_board_query_get_card(self):
+        board = leankit.Board(100000000)
+        self.assertEqual(1, len(board.query(tag='Tag1')))
+        card_dict = dict(board.cards[100010001].raw_data, LaneId=100001002,
+                         Tags='Tag3', AssignedUserIds=[])
+        with patch.object(leankit.kanban.api, 'get', return_value=card_dict):
+            card = board.get_card(100010001)
+        self.assertEqual([], board.query(tag='Tag1'))
+        self.assertEqual([card], board.query(lane=100001002, tag='Tag3'))
+
+    def test_board_sorted_lanes(self):
+        lanes = self.board.sorted_lanes
+        self.assertEqual(len(self.board.lanes), len(lanes))
+        self.assertEqual(self.board.archive_lanes, lanes[-3:])
+        self.assertIs(self.board.backlog_top_level_lane, lanes[0])
+
     def test_card_str(self):
         self.assertEqual('100010001', str(self.board.cards[100010001]))
 
@@ -116,7 +316,124 @@ class TestKanban(unittest.TestCase):
         self.assertEqual(1, len(self.board.cards[100010001].assigned_users))
         self.assertEqual([], self.board.cards[100010002].assigned_users)
 
+    def test_card_cached_values(self):
+        card = leankit.Board(100000000).cards[100010001]
+        self.assertIs(card.last_move, card.last_move)
+        users = card.assigned_users
+        self.assertIs(users[0], card.assigned_users[0])
+        users.clear()
+        card.tags.append('Tag3')
+        self.assertNotEqual([], card.assigned_users)
+        self.assertNotIn('Tag3', card.tags)
+        card['Tags'] = 'Tag3'
+        self.assertEqual(['Tag3'], card.tags)
+        card.update(Tags='')
+        self.assertEqual([], card.tags)
+
+    def test_converter_names(self):
+        card = self.board.cards[100010001]
+        self.assertFalse(hasattr(card, 'no_such_attribute'))
+        self.assertNotIn('no_such_attribute', leankit.kanban.Converter._names_)
+        card.title
+        self.assertEqual('Title', leankit.kanban.Converter._names_['title'])
+
+    def test_board_parse_dates(self):
+        board = leankit.Board(100000000, timezone='Europe/Berlin')
+        card = board.cards[100010001]
+        card.history
+        board.parse_dates()
+        self.assertIn('LastMove', card.__dict__['_values_'])
+        self.assertIn('DateTime', card.history[0].__dict__['_values_'])
+        self.assertEqual("2017-02-27 17:58:08+01:00", str(card.last_move))
+
     def test_event_date_time(self):
         expected = "2017-03-10 11:21:01+01:00"
         actual = str(self.board.cards[100010001].history[-1].date_time)
         self.assertEqual(expected, actual)
+
+
+class TestCompact(TestKanban):
+    @classmethod
+    def setUpClass(cls):
+        cls.board = leankit.Board(100000000, timezone='Europe/Berlin',
+                                  compact=True)
+        cls.board.get_archive()
+
+    def test_card_storage(self):
+        card = self.board.cards[100010001]
+        self.assertIsInstance(card, leankit.kanban.Card)
+        raw = dict(card.items())
+        self.assertEqual(raw, {**card})
+        self.assertEqual(json.dumps(raw), json.dumps(card))
+        self.assertEqual('Task 2', card.raw_data['Title'])
+        self.assertIs(card.lane.cards, card.lane['Cards'])
+        copied = pickle.loads(pickle.dumps(card))
+        self.assertTrue(copied.board.compact)
+        self.assertEqual(raw, dict(copied.items()))
+
+    def test_card_update(self):
+        card = leankit.Board(100000000, compact=True).cards[100010001]
+        card['Extra'] = 1
+        self.assertEqual(1, card.extra)
+        self.assertEqual(dict(card.items()), card)
+        del card['Title']
+        self.assertNotIn('Title', card.keys())
+        self.assertRaises(KeyError, card.__getitem__, 'Title')
+
+
+class TestLazy(TestKanban):
+    @classmethod
+    def setUpClass(cls):
+        cls.board = leankit.Board(100000000, timezone='Europe/Berlin',
+                                  lazy=True)
+        cls.board.get_archive()
+
+    def test_lazy_access(self):
+        board = leankit.Board(100000000, lazy=True)
+        self.assertEqual([], board.lanes.loaded() + board.cards.loaded())
+        self.assertEqual(2, len(board.cards))
+        self.assertIn(100010002, board.cards)
+        card = board.cards[100010002]
+        self.assertIs(card, board.cards[100010002])
+        self.assertIs(board.lanes[100001001], card.lane)
+        self.assertIs(board.lanes[100001001], board.backlog[100001001])
+        self.assertEqual([card.lane], board.lanes.loaded())
+        self.assertEqual([card], board.cards.loaded())
+        eager = leankit.Board(100000000)
+        self.assertEqual(list(eager.lanes), list(board.lanes))
+        self.assertEqual(list(eager.cards), list(board.cards))
+
+    def test_lazy_refresh(self):
+        board = leankit.kanban.api.get('/Boards/100000000')
+        backlog = board['Backlog'][0]
+        sublane = dict(backlog, Id=100001099, ParentLaneId=backlog['Id'],
+                       ChildLaneIds=[], Cards=[])
+        older = dict(board, Backlog=[dict(backlog, ChildLaneIds=[100001099]),
+                                     sublane])
+        newer = dict(board, Version=board['Version'] + 1)
+        board = leankit.Board(older, lazy=True)
+        with patch.object(leankit.kanban.api, 'get', return_value=newer):
+            changes = board.refresh()
+        self.assertIn(100001099, [lane.id for lane in changes['lanes']])
+        for lanes in [board.lanes, board['Backlog']]:
+            self.assertNotIn(100001099, lanes)
+            self.assertEqual(list(lanes), [lane.id for lane in lanes.values()])
+
+    def test_lazy_tree(self):
+        board = leankit.Board(100000000, lazy=True)
+        eager = leankit.Board(100000000)
+        lane = board.lanes[100001001]
+        self.assertEqual(str(eager.lanes[100001001]), str(lane))
+        self.assertEqual(eager.lanes[100001001].left, lane.left)
+        self.assertEqual([lane], board.lanes.loaded())
+        self.assertEqual(list(lane.cards), board.cards.loaded())
+        self.assertEqual([sublane.id for sublane in eager.sorted_lanes],
+                         [sublane.id for sublane in board.sorted_lanes])
+
+    def test_lazy_threads(self):
+        board = leankit.Board(100000000, lazy=True)
+        with ThreadPoolExecutor(8) as executor:
+            cards = list(executor.map(lambda _: board.cards[100010002],
+                                      range(32)))
+        self.assertTrue(all(card is cards[0] for card in cards))
+        self.assertIs(cards[0], cards[0].lane.cards[0])
@@ -1,7 +1,61 @@
+import sys
 import unittest
 
 import leankitmocks as leankit
-from leankit.kanban import Lane
+from leankit.kanban import Board, Lane
+from benchmarks.layout import chain
+from benchmarks.stub import board as payload
+
+
+class Recursive(object):
+    """ Geometry of the lanes as computed before compute_layout, walking
+    the lanes recursively, to compare with """
+
+    def __init__(self, board):
+        self.board = board
+        self.cache = {}
+
+    def __call__(self, name, lane):
+        key = name, lane.id
+        if key not in self.cache:
+            self.cache[key] = getattr(self, name)(lane)
+        return self.cache[key]
+
+    def left(self, lane):
+        if lane.orientation == 1:
+            return self('left', lane.parent_lane)
+        elif lane.left_lanes:
+            return self('right', lane.left_lanes[-1]) + lane.BORDER
+        elif lane.parent_lane:
+            return self('left', lane.parent_lane)
+        return 0
+
+    def right(self, lane):
+        if lane.child_lanes:
+            return max(self('right', child) for child in lane.child_lanes)
+        return self('left', lane) + lane['Width'] * lane.WIDTH
+
+    def top(self, lane):
+        if lane.orientation == 1 and lane.left_lanes:
+            return self('bottom', lane.left_lanes[-1]) + lane.BORDER
+        elif lane.parent_lane:
+            return self('top', lane.parent_lane) + lane.HEADER + lane.BORDER
+        return 0
+
+    def bottom(self, lane):
+        if lane.child_lanes:
+            return max(self('bottom', child) for child in lane.child_lanes)
+        return self('top', lane) + lane.HEADER + lane.BORDER + lane.BOX
+
+    def height(self, lane):
+        if lane.parent_lane:
+            last_lane = len(lane.left_lanes) == len(lane.sibling_lanes)
+            if lane.orientation == 0 or last_lane:
+                difference = self('top', lane) - self('top', lane.parent_lane)
+                return self('height', lane.parent_lane) - difference
+            return self('bottom', lane) - self('top', lane)
+        return max(self('bottom', other)
+                   for other in self.board.lanes.values())
 
 
 class TestKanban(unittest.TestCase):
@@ -61,3 +115,28 @@ class TestKanban(unittest.TestCase):
         self.assertEqual(bottom, self.lanes["Lane 3.1"].bottom)
         self.assertEqual(bottom, self.lanes["Lane 3.1.2"].bottom)
         self.assertEqual(bottom, self.lanes["Lane 3.1.2.2.1"].bottom)
+
+
+class TestLayout(unittest.TestCase):
+    def test_recursive(self):
+        archived = leankit.Board(100000000)
+        archived.get_archive()
+        for board in [archived, leankit.Board(300000000)]:
+            recursive = Recursive(board)
+            for lane in board.lanes.values():
+                for name in ['left', 'right', 'top', 'bottom', 'height']:
+                    self.assertEqual(recursive(name, lane),
+                                     getattr(lane, name), (lane.id, name))
+
+    def test_deep(self):
+        count = sys.getrecursionlimit() + 100
+        data = payload(cards=0)
+        data['Lanes'] += chain(count)
+        data['TopLevelLaneIds'].append(1000)
+        board = Board(data)
+        deepest = board.lanes[1000 + count - 1]
+        self.assertEqual(count - 1, deepest.depth)
+        self.assertEqual((count - 1) * (Lane.HEADER + Lane.BORDER),
+                         deepest.top)
+        self.assertEqual(deepest.bottom, board.lanes[1000].bottom)
+        self.assertEqual(Lane.WIDTH, board.lanes[1000].width)
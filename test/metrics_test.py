@@ -0,0 +1,102 @@
+import unittest
+
+import leankitmocks as leankit
+
+try:
+    import numpy as np
+    from leankit.metrics import Flow, END
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def events(*rows):
+    card, kind, time, lane = zip(*rows)
+    return {'CardId': np.array(card), 'Type': np.array(kind, dtype=object),
+            'DateTime': np.array(time, dtype='datetime64[s]'),
+            'ToLaneId': np.array(lane)}
+
+
+@unittest.skipUnless(np, 'Missing numpy')
+class TestFlow(unittest.TestCase):
+    def setUp(self):
+        create, move = 'CardCreationEventDTO', 'CardMoveEventDTO'
+        self.flow = Flow(events(
+            (1, create, '2017-01-01', 10), (1, move, '2017-01-03', 20),
+            (1, move, '2017-01-08', 30), (2, create, '2017-01-02', 10),
+            (2, 'CommentPostEventDTO', '2017-01-02', 0),
+            (2, move, '2017-01-04', 20), (3, create, '2017-01-05', 10)))
+
+    def test_intervals(self):
+        self.assertEqual([1, 1, 1, 2, 2, 3], list(self.flow.card))
+        self.assertEqual(np.datetime64('2017-01-03'), self.flow.end[0])
+
+    def test_cycle_time(self):
+        cards, times = self.flow.cycle_time([20], [30])
+        self.assertEqual([1], list(cards))
+        self.assertEqual([np.timedelta64(5, 'D')], list(times))
+
+    def test_lead_time(self):
+        cards, times = self.flow.lead_time([20])
+        self.assertEqual([1, 2], list(cards))
+        self.assertEqual([np.timedelta64(2, 'D')] * 2, list(times))
+
+    def test_wip(self):
+        days = np.arange('2017-01-01', '2017-01-10', dtype='datetime64[D]')
+        wip = self.flow.wip(days)
+        self.assertEqual([1, 2, 1, 0, 1, 1, 1, 1, 1], list(wip[10]))
+        self.assertEqual([0, 0, 1, 2, 2, 2, 2, 1, 1], list(wip[20]))
+        self.assertEqual([0, 0, 0, 0, 0, 0, 0, 1, 1], list(wip[30]))
+
+    def test_cumulative_flow(self):
+        days = ['2017-01-01', '2017-01-04', '2017-01-09']
+        flow = self.flow.cumulative_flow(days)
+        self.assertEqual([1, 2, 3], list(flow[10]))
+        self.assertEqual([0, 2, 2], list(flow[20]))
+
+    def test_throughput(self):
+        bins = ['2017-01-01', '2017-01-04', '2017-01-07']
+        self.assertEqual([1, 1], list(self.flow.throughput([20], bins)))
+
+    def test_update(self):
+        self.flow.update(events((1, 'CardMoveEventDTO', '2017-01-10', 40),
+                                (3, 'CardMoveEventDTO', '2017-01-06', 20)))
+        self.assertEqual([1, 1, 1, 1, 2, 2, 3, 3], list(self.flow.card))
+        cards, times = self.flow.cycle_time([20], [30])
+        self.assertEqual([1], list(cards))
+        self.assertEqual([np.timedelta64(5, 'D')], list(times))
+        self.assertEqual(np.datetime64('2017-01-10'), self.flow.end[2])
+        self.assertEqual([1, 2, 3], list(self.flow.lead_time([20])[0]))
+
+    def test_update_merged(self):
+        flow = Flow(events((1, 'CardMoveEventDTO', '2017-01-03', 20),
+                           (2, 'CardMoveEventDTO', '2017-01-04', 20),
+                           (1, 'CardCreationEventDTO', '2017-01-01', 10)))
+        flow.update(events((1, 'CardMoveEventDTO', '2017-01-02', 30)))
+        self.assertEqual([1, 1, 1, 2], list(flow.card))
+        self.assertEqual([10, 30, 20, 20], list(flow.lane))
+        self.assertEqual(list(np.array(['2017-01-02', '2017-01-03', END, END],
+                                       dtype='datetime64[s]')),
+                         list(flow.end))
+
+    def test_update_empty(self):
+        flow = Flow()
+        flow.update(events((1, 'CommentPostEventDTO', '2017-01-02', 0)))
+        self.assertEqual((0, 0), (len(flow.card), len(flow.end)))
+        self.assertEqual({}, flow.wip(['2017-01-03']))
+
+    def test_replace(self):
+        self.flow.replace(events((3, 'CardMoveEventDTO', '2017-01-06', 20),
+                                 (3, 'CardCreationEventDTO', '2017-01-05',
+                                  10)))
+        self.assertEqual([1, 2, 3], list(self.flow.lead_time([20])[0]))
+        self.assertEqual(7, len(self.flow))
+
+    def test_board(self):
+        board = leankit.Board(100000000)
+        flow = Flow(board.events_table())
+        cards, times = flow.cycle_time([100001002], [100001004])
+        self.assertEqual([100010001], list(cards))
+
+
+if __name__ == "__main__":
+    unittest.main()
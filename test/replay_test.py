@@ -0,0 +1,42 @@
+import unittest
+
+from leankit.replay import Replay
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.moves = [(0, 1, 10), (5, 1, 11), (2, 2, 10), (7, 2, 12),
+                      (3, 3, 11), (9, 1, 12), (9, 3, 12)]
+        self.replay = Replay(self.moves, interval=2)
+
+    def expected(self, when):
+        placement = {}
+        for time, card, lane in sorted(self.moves, key=lambda m: m[0]):
+            if time <= when:
+                placement[card] = lane
+        return placement
+
+    def test_state_at(self):
+        for when in range(-1, 11):
+            self.assertEqual(self.expected(when), self.replay.state_at(when))
+
+    def test_counts_at(self):
+        for when in range(-1, 11):
+            counts = {}
+            for lane in self.expected(when).values():
+                counts[lane] = counts.get(lane, 0) + 1
+            self.assertEqual(counts, self.replay.counts_at(when))
+
+    def test_interval(self):
+        replay = Replay(self.moves)
+        self.assertEqual(1, len(replay._placements_))
+        self.assertEqual({1: 11, 2: 10, 3: 11}, replay.state_at(6))
+
+    def test_empty(self):
+        replay = Replay([])
+        self.assertEqual({}, replay.state_at(0))
+        self.assertEqual({}, replay.counts_at(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
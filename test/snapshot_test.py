@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+import leankitmocks as leankit
+from leankit import snapshot
+from leankit.kanban import KanbanError
+
+
+class TestSnapshot(unittest.TestCase):
+    compact = lazy = False
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.path = os.path.join(folder.name, 'board.snapshot')
+        self.board = leankit.Board(100000000, timezone='Europe/Berlin',
+                                   compact=self.compact, lazy=self.lazy)
+        self.board.get_archive()
+        self.board.prefetch_history()
+
+    def test_restore(self):
+        self.board.save_snapshot(self.path)
+        board = leankit.Board.load_snapshot(self.path)
+        self.assertEqual(self.board.timezone, board.timezone)
+        self.assertEqual(self.compact, board.compact)
+        self.assertEqual(self.lazy, board.lazy)
+        self.assertEqual(self.board.version, board.version)
+        self.assertEqual([lane.id for lane in self.board.sorted_lanes],
+                         [lane.id for lane in board.sorted_lanes])
+        self.assertEqual(3, len(board.archive_lanes))
+        for card in self.board.cards.values():
+            restored = board.cards[card.id]
+            self.assertEqual(dict(card.items()), dict(restored.items()))
+            self.assertEqual(card.lane.id, restored.lane.id)
+            self.assertIn('history', restored.__dict__)
+            self.assertEqual([event.date_time for event in card.history],
+                             [event.date_time for event in restored.history])
+            self.assertEqual(card.history, restored.history)
+
+    def test_subclass(self):
+        class Subclass(leankit.Board):
+            pass
+
+        self.board.save_snapshot(self.path)
+        self.assertIsInstance(Subclass.load_snapshot(self.path), Subclass)
+
+    def test_replaced_card(self):
+        card = self.board.get_card(100010001)
+        card.__dict__['comments'] = [{'Text': 'Comment'}]
+        self.board.save_snapshot(self.path)
+        board = leankit.Board.load_snapshot(self.path)
+        self.assertEqual(card['Version'], board.cards[card.id]['Version'])
+        self.assertEqual(card.comments, board.cards[card.id].comments)
+        self.assertNotIn('history', board.cards[card.id].__dict__)
+
+    def test_version(self):
+        with open(self.path, 'wb') as data:
+            data.write(snapshot.HEADER.pack(snapshot.MAGIC, 99))
+        self.assertRaises(KanbanError, snapshot.load, self.path)
+        with open(self.path, 'wb') as data:
+            data.write(b'{"Id": 1}' * 2)
+        self.assertRaises(KanbanError, snapshot.load, self.path)
+
+
+class TestCompactSnapshot(TestSnapshot):
+    compact = True
+
+
+class TestLazySnapshot(TestSnapshot):
+    lazy = True
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import json
+import unittest
+from json import JSONDecodeError
+
+from leankit.stream import items, select
+
+
+class TestStream(unittest.TestCase):
+    def setUp(self):
+        self.data = {'ReplyCode': 200, 'ReplyData': [[
+            {'Id': i, 'Title': 'Card "{}" \\ é'.format(i), 'Size': 10 ** i,
+             'Tags': [], 'Lane': {'Id': -1.5e3, 'Active': True}}
+            for i in range(20)]], 'Total': 1234567}
+        self.text = json.dumps(self.data, indent=2)
+
+    def chunks(self, size):
+        return [self.text[i:i + size] for i in range(0, len(self.text), size)]
+
+    def test_items(self):
+        paths = ['ReplyData.item.item.Lane', 'Total']
+        expected = list(select(self.data, *paths))
+        self.assertEqual(21, len(expected))
+        for size in [1, 3, 64, len(self.text)]:
+            self.assertEqual(expected, list(items(self.chunks(size), *paths)))
+
+    def test_items_root(self):
+        self.assertEqual([('', self.data)], list(items(self.chunks(5), '')))
+
+    def test_items_prefix(self):
+        paths = ['ReplyData.item.item.Id']
+        values = [value for _, value in items(self.chunks(7), *paths)]
+        self.assertEqual(list(range(20)), values)
+        self.assertEqual([], list(items(self.chunks(7), 'Reply')))
+
+    def test_items_numbers(self):
+        text = '{"a": [1.5, -12, 1.5e3, 2E-2, 0, 30, true, null]}'
+        expected = [('a.item', value) for value in json.loads(text)['a']]
+        for split in range(1, len(text)):
+            chunks = [text[:split], text[split:]]
+            self.assertEqual(expected, list(items(chunks, 'a.item')), split)
+        self.assertEqual([('a.item', 1.5), ('a.item', 2)],
+                         list(items(['{"a": [1.', '5, 2]}'], 'a.item')))
+        self.assertEqual([('a.item', 1.5e3), ('a.item', 2)],
+                         list(items(['{"a": [1.5e', '3, 2]}'], 'a.item')))
+        self.assertEqual([('', 125)], list(items(['1', '2', '5'], '')))
+
+    def test_items_invalid(self):
+        with self.assertRaises(JSONDecodeError):
+            list(items(self.chunks(10)[:-3], 'Total'))
+        with self.assertRaises(JSONDecodeError):
+            list(items(['{"a": 1}', ' 2'], 'a'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import queue
+import asyncio
+import logging
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from leankit.connector import Connector
+from leankit.kanban import Board
+from leankit.watch import Watch
+from benchmarks.stub import StubServer, board
+
+
+logging.disable(logging.WARNING)
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        url = '/Board/{}/BoardVersion/{}/GetNewerIfExists'
+        self.routes = {url.format(1, 1): board(1, cards=5),
+                       url.format(1, 2): None, url.format(2, 1): None}
+        self.routes[url.format(1, 1)]['Version'] = 2
+        server = StubServer(self.routes)
+        server.__enter__()
+        self.addCleanup(server.__exit__)
+        connector = Connector(retries=0)
+        connector.base = server.base
+        connector.session = requests.Session()
+        self.addCleanup(connector.session.close)
+        patcher = patch('leankit.kanban.api', connector)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.changes = []
+        self.queue = queue.Queue()
+        self.boards = [Board(board(1, cards=3)), Board(board(2, cards=3))]
+        self.watch = Watch(self.boards, [self.collect], self.queue,
+                           interval=60, minimum=5, maximum=100, rate=100)
+
+    def collect(self, board, changes):
+        self.changes.append((board, changes))
+
+    def test_poll(self):
+        updates = self.watch.poll()
+        self.assertEqual([self.boards[0]], [board for board, _ in updates])
+        self.assertEqual(2, self.boards[0].version)
+        self.assertEqual(2, len(updates[0][1]['added']))
+        self.assertEqual(updates, self.changes)
+        self.assertIs(self.boards[0], self.queue.get_nowait())
+        self.assertEqual({1: 30, 2: 90}, self.watch.intervals)
+        self.assertEqual([], self.watch.poll())
+        self.assertEqual({'polls': 2, 'changes': 1, 'errors': 0},
+                         {key: self.watch.stats[key]
+                          for key in ['polls', 'changes', 'errors']})
+
+    def test_schedule(self):
+        self.watch.poll()
+        with patch('leankit.watch.monotonic') as monotonic:
+            monotonic.return_value = self.watch._schedule_[1][0] + 1
+            self.assertEqual([], self.watch.poll())
+            self.assertEqual({1: 45, 2: 90}, self.watch.intervals)
+            monotonic.return_value += 1000
+            self.watch.poll()
+        self.assertEqual({1: 67.5, 2: 100}, self.watch.intervals)
+
+    def test_error(self):
+        self.watch.add(Board(board(3, cards=1)))
+        self.watch.poll()
+        self.assertEqual(1, self.watch.stats['errors'])
+        self.assertEqual(90, self.watch.intervals[3])
+
+    def test_iterate(self):
+        self.watch.remove(2)
+        self.assertIs(self.boards[0], next(iter(self.watch)))
+        self.watch.stop()
+        self.assertEqual([], list(self.watch))
+
+    def test_async_iterate(self):
+        async def first():
+            async for updated in self.watch:
+                self.watch.stop()
+                return updated
+
+        self.assertIs(self.boards[0], asyncio.run(first()))
+
+
+if __name__ == "__main__":
+    unittest.main()